@@ -1,5 +1,5 @@
 # app/__init__.py
-from flask import Flask, request
+from flask import Flask, jsonify
 from configparser import ConfigParser
 import os
 
@@ -8,60 +8,145 @@ def load_config():
     config.read('config.ini')
     
     secret_key = config.get('server', 'secret_key', fallback='default-12345-secret-key')
+    data_seed = config.get('data', 'seed', fallback='').strip()
+    preload = config.get('data', 'preload', fallback='')
+    
+    # Virtual row counts per resource, e.g. "users = 1000000000"
+    resource_totals = {}
+    if config.has_section('resources'):
+        resource_totals = {name: int(total) for name, total in config.items('resources') if total.strip()}
+    
+    # Per-route latency profiles, e.g. [latency:/api/orders]
+    latency_profiles = {
+        section.split(':', 1)[1]: dict(config.items(section))
+        for section in config.sections() if section.startswith('latency:')
+    }
+    
+    # Share of requests logged per status class, e.g. "sample_2xx = 0.01"
+    sample_rates = {
+        status_class: config.getfloat('logging', f'sample_{status_class}')
+        for status_class in ('1xx', '2xx', '3xx', '4xx', '5xx')
+        if config.has_option('logging', f'sample_{status_class}')
+    }
+    
+    match_headers = config.get('replay', 'match_headers', fallback='')
     
     return {
         'PORT': int(config['server']['port']),
         'DEBUG': config['server'].getboolean('debug'),
-        'SECRET_KEY': secret_key
+        'SECRET_KEY': secret_key,
+        'ADMIN_API_KEYS': config.get('auth', 'admin_api_keys', fallback=''),
+        'API_KEY_TTL': config.getint('auth', 'api_key_ttl', fallback=0),
+        'MAX_TOKENS': config.getint('auth', 'max_tokens', fallback=1_000_000),
+        'ADMIN_KEYS_WRITE_DELAY': config.getfloat('auth', 'admin_keys_write_delay', fallback=0.5),
+        'STATE_BACKEND': config.get('auth', 'state_backend', fallback='memory').strip() or 'memory',
+        'STATE_PATH': config.get('auth', 'state_path', fallback='mock-box-state.db').strip() or 'mock-box-state.db',
+        'JWT_CACHE_SIZE': config.getint('auth', 'jwt_cache_size', fallback=4096),
+        'JSON_PROVIDER': config.get('server', 'json_provider', fallback='auto').strip() or 'auto',
+        'DATA_SEED': int(data_seed) if data_seed else None,
+        'MAX_PAGE_LIMIT': config.getint('data', 'max_limit', fallback=1_000_000),
+        'SCHEMA_DIR': config.get('data', 'schema_dir', fallback='').strip(),
+        'MAX_MATERIALIZED_ROWS': config.getint('data', 'max_materialized_rows', fallback=5_000_000),
+        'MATERIALIZED_TABLES': config.getint('data', 'materialized_tables', fallback=16),
+        'SNAPSHOT_DIR': config.get('data', 'snapshot_dir', fallback='').strip(),
+        'SNAPSHOT_PRELOAD': [name.strip() for name in preload.split(',') if name.strip()],
+        'RESOURCE_TOTALS': resource_totals,
+        'LATENCY_PROFILES': latency_profiles,
+        'CACHE_ENABLED': config.getboolean('cache', 'enabled', fallback=True),
+        'CACHE_MAX_ENTRIES': config.getint('cache', 'max_entries', fallback=256),
+        'CACHE_MAX_ENTRY_BYTES': config.getint('cache', 'max_entry_bytes', fallback=1 << 20),
+        'COMPRESSION_ENABLED': config.getboolean('compression', 'enabled', fallback=True),
+        'COMPRESSION_MIN_SIZE': config.getint('compression', 'min_size', fallback=1024),
+        'ACCESS_LOG': config.get('logging', 'access_log', fallback='').strip(),
+        'ACCESS_LOG_SAMPLE_RATES': sample_rates,
+        'ACCESS_LOG_BUFFER_SIZE': config.getint('logging', 'buffer_size', fallback=65536),
+        'ACCESS_LOG_FLUSH_INTERVAL': config.getfloat('logging', 'flush_interval', fallback=0.5),
+        'REPLAY_MODE': config.get('replay', 'mode', fallback='off').strip() or 'off',
+        'REPLAY_FIXTURES': config.get('replay', 'fixtures', fallback='fixtures.mbx').strip() or 'fixtures.mbx',
+        'REPLAY_UPSTREAM': config.get('replay', 'upstream', fallback='').strip(),
+        'REPLAY_MATCH_HEADERS': [name.strip() for name in match_headers.split(',') if name.strip()]
     }
 
-def create_app():
+def create_app(overrides=None):
     app = Flask(__name__)
     
     # Load config
     app.config.update(load_config())
+    if overrides:
+        app.config.update(overrides)
+
+    # Per-endpoint latency histograms (/metrics); registered first so the
+    # timing includes injected latency and cache lookups
+    from .metrics import init_metrics
+    init_metrics(app)
+
+    # JSON serialization backend (orjson/msgspec when installed)
+    from .json_provider import init_json_provider
+    init_json_provider(app)
 
     # Initialize auth manager with app context
     from .auth import auth_manager
     auth_manager.init_app(app)
+
+    # Injected latency (?delay=<ms> and per-route profiles)
+    from .latency import init_latency
+    init_latency(app)
+
+    # Pre-serialized response cache
+    from .cache import init_cache
+    init_cache(app)
+    
+    # Recorded fixtures ([replay]), served ahead of the generated routes
+    from .fixtures import init_replay
+    init_replay(app)
     
     # Register Home Blueprint (root routes)
     from .home import home_bp
     app.register_blueprint(home_bp)
     
-    # Register Authentication Blueprint
-    from .routes.auth import auth_bp
-    app.register_blueprint(auth_bp, url_prefix='/api')
+    # Compile schema-driven resources (app/schemas plus [data] schema_dir)
+    from .schema import init_schemas
+    from .relational import init_relational_store, preload_tables
+    schemas = init_schemas(app)
+    init_relational_store(app)
 
-    # Register Admin Blueprint
+    # Register API Blueprints. All URL rules are registered here: heavy
+    # dependencies (PyJWT, Markdown, PyYAML) are imported by the views that use them
+    from .routes.auth import auth_bp
     from .routes.admin import admin_bp
-    app.register_blueprint(admin_bp, url_prefix='/api')
-    
-    # Register API Blueprints
     from .routes.phone_numbers import phone_numbers_bp
     from .routes.errors import errors_bp
     from .routes.data import data_bp
-    from .routes.products import products_bp
-    from .routes.users import users_bp
-    from .routes.orders import orders_bp
-    from .routes.rss_feed import rss_feed_bp
-    from .routes.credit_lines import credit_lines_bp
-    from .routes.user_activities import user_activities_bp
+    from .routes.batch import batch_bp
+    from .routes.resources import resources_blueprint
+
+    for blueprint in (auth_bp, admin_bp, phone_numbers_bp, errors_bp, data_bp, batch_bp, resources_blueprint(schemas)):
+        app.register_blueprint(blueprint, url_prefix='/api')
 
-    app.register_blueprint(phone_numbers_bp, url_prefix='/api')
-    app.register_blueprint(errors_bp, url_prefix='/api')
-    app.register_blueprint(data_bp, url_prefix='/api')
-    app.register_blueprint(products_bp, url_prefix='/api')
-    app.register_blueprint(users_bp, url_prefix='/api')
-    app.register_blueprint(orders_bp, url_prefix='/api')
-    app.register_blueprint(rss_feed_bp, url_prefix='/api')
-    app.register_blueprint(credit_lines_bp, url_prefix='/api')
-    app.register_blueprint(user_activities_bp, url_prefix='/api')
+    # Map (or generate and snapshot) the [data] preload tables
+    preload_tables(app, schemas)
     
-    # After request logging
-    @app.after_request
-    def log_request(response):
-        app.logger.info(f'{request.method} {request.path} - {response.status_code}')
-        return response
+    # Malformed limit/offset/cursor parameters
+    from .pagination import PaginationError
+
+    @app.errorhandler(PaginationError)
+    def handle_pagination_error(error):
+        return jsonify({'error': str(error)}), 400
+
+    # Malformed or unsupported filters
+    from .relational import QueryError
+
+    @app.errorhandler(QueryError)
+    def handle_query_error(error):
+        return jsonify({'error': str(error)}), 400
+    
+    # After request logging, written in the background
+    from .access_log import init_access_log
+    init_access_log(app)
+
+    # Negotiated gzip/br/zstd; registered last so it runs first among the
+    # after_request hooks, and the log, metrics and throttling see encoded bytes
+    from .compression import init_compression
+    init_compression(app)
 
     return app
\ No newline at end of file
@@ -0,0 +1,151 @@
+# app/access_log.py
+from collections import deque
+from flask import g, request
+import atexit
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+# Status classes a sampling rate can be set for
+STATUS_CLASSES = ('1xx', '2xx', '3xx', '4xx', '5xx')
+
+class FileSink:
+    """
+    Buffered, append-only file sink.
+    Lines are only written in whole batches, so worker processes can share
+    one log file without interleaving partial lines.
+    """
+
+    def __init__(self, path, buffer_size=65536):
+        self.path = path
+        self.buffer_size = buffer_size
+        self._buffer = bytearray()
+        if path == '-':
+            self._fd = sys.stderr.fileno()
+        else:
+            self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def write(self, line):
+        self._buffer += line
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            data, self._buffer = bytes(self._buffer), bytearray()
+            while data:
+                data = data[os.write(self._fd, data):]
+
+class AccessLog:
+    """
+    Sampled access log written as JSON lines by a background thread.
+    Request threads append a tuple to an in-memory queue and return; when
+    the queue is full the entry is dropped (and counted) rather than waited on.
+    """
+
+    def __init__(self, sink, sample_rates=None, queue_size=100_000, flush_interval=0.5):
+        self.sink = sink
+        self.sample_rates = {status_class: 1.0 for status_class in STATUS_CLASSES}
+        self.sample_rates.update(sample_rates or {})
+        # Indexed by status // 100
+        self._rates = [1.0] + [self.sample_rates[status_class] for status_class in STATUS_CLASSES]
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = deque()
+        self._writer = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def log(self, entry):
+        """
+        Queue (timestamp, method, path, query, status, duration_ms, bytes,
+        remote_addr, user_agent) for writing, subject to sampling
+        """
+        status = entry[4]
+        rate = self._rates[status // 100] if 100 <= status < 600 else 1.0
+        if rate < 1.0 and random.random() >= rate:
+            return
+        if len(self._queue) >= self.queue_size:
+            self.dropped += 1
+            return
+        self._queue.append(entry)
+        if self._writer is None:
+            self._start()
+
+    def _start(self):
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name='mock-box-access-log', daemon=True)
+                self._writer.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.drain()
+
+    def drain(self):
+        """Format and write every queued entry"""
+        with self._lock:
+            queue, write = self._queue, self.sink.write
+            for _ in range(len(queue)):
+                ts, method, path, query, status, duration_ms, size, remote_addr, user_agent = queue.popleft()
+                record = {
+                    'ts': ts,
+                    'method': method,
+                    'path': path,
+                    'status': status,
+                    'duration_ms': duration_ms,
+                    'bytes': size,
+                    'remote_addr': remote_addr
+                }
+                if query:
+                    record['query'] = query
+                if user_agent:
+                    record['user_agent'] = user_agent
+                write(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n')
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                write(json.dumps({'ts': time.time(), 'dropped': dropped}).encode('utf-8') + b'\n')
+            self.sink.flush()
+
+    def close(self):
+        self._stopped.set()
+        self.drain()
+
+def init_access_log(app):
+    """Install the access log hook configured by the [logging] section"""
+    path = app.config.get('ACCESS_LOG', '')
+    if not path:
+        # Previously the access log only showed through app.logger in debug mode
+        if not app.config.get('DEBUG'):
+            return None
+        path = '-'
+    access_log = app.extensions['access_log'] = AccessLog(
+        FileSink(path, buffer_size=app.config.get('ACCESS_LOG_BUFFER_SIZE', 65536)),
+        sample_rates=app.config.get('ACCESS_LOG_SAMPLE_RATES'),
+        flush_interval=app.config.get('ACCESS_LOG_FLUSH_INTERVAL', 0.5)
+    )
+    perf_counter = time.perf_counter
+
+    @app.after_request
+    def log_request(response):
+        start = g.get('request_start')
+        environ = request.environ
+        access_log.log((
+            time.time(),
+            request.method,
+            request.path,
+            environ.get('QUERY_STRING', ''),
+            response.status_code,
+            None if start is None else round((perf_counter() - start) * 1000, 3),
+            response.content_length,
+            request.remote_addr,
+            environ.get('HTTP_USER_AGENT')
+        ))
+        return response
+
+    return access_log
@@ -0,0 +1,268 @@
+# app/asgi.py
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, unquote
+import asyncio
+import io
+import sys
+from .latency import BANDWIDTH_KEY, DELAY_APPLIED_KEY, THROTTLE_CHUNK_SIZE, plan_latency
+
+# Endpoints whose views only generate data (no blocking I/O); small pages of
+# them run directly on the event loop instead of in the thread pool, as do
+# those of the schema-driven resources
+ASYNC_PATHS = frozenset([
+    '/api/phone-numbers/public',
+    '/api/data',
+    '/api/error'
+])
+
+# Query parameters that keep a request on the event loop; any other (e.g. a
+# filter, which may build or scan a table) sends it to the thread pool
+INLINE_PARAMS = frozenset(('seed', 'limit', 'offset', 'cursor', 'count', 'type', 'stream', 'delay'))
+
+# Largest count/limit generated on the event loop
+MAX_INLINE_ROWS = 1000
+
+MAX_HEADER_BYTES = 64 * 1024
+
+class AsgiApp:
+    """
+    ASGI front-end for the Flask app.
+    Injected delays are awaited with asyncio.sleep, so a slow in-flight
+    request holds no thread. Data-generating endpoints then run on the event
+    loop; every other route runs on a bounded thread pool.
+    """
+
+    def __init__(self, flask_app, threads=32):
+        self.flask_app = flask_app
+        schemas = flask_app.extensions.get('schemas', {})
+        self.async_paths = ASYNC_PATHS | {f'/api{schema.route}' for schema in schemas.values() if schema.route}
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='mock-box-asgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        query = scope.get('query_string', b'').decode('latin-1')
+        params = dict(parse_qsl(query))
+        profiles = self.flask_app.extensions.get('latency_profiles')
+        delay, _ = plan_latency(profiles, scope['path'], params)
+        if delay:
+            await asyncio.sleep(delay)
+
+        environ = build_environ(scope, body)
+        environ[DELAY_APPLIED_KEY] = True
+
+        if self.runs_inline(scope['path'], params):
+            status, headers, chunks = self._call_wsgi(environ)
+        else:
+            loop = asyncio.get_running_loop()
+            status, headers, chunks = await loop.run_in_executor(self.executor, self._call_wsgi_buffered, environ)
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+        })
+        bandwidth = environ.get(BANDWIDTH_KEY)
+        try:
+            for chunk in chunks:
+                if not bandwidth:
+                    if chunk:
+                        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                    continue
+                for start in range(0, len(chunk), THROTTLE_CHUNK_SIZE):
+                    piece = chunk[start:start + THROTTLE_CHUNK_SIZE]
+                    await asyncio.sleep(len(piece) / bandwidth)
+                    await send({'type': 'http.response.body', 'body': piece, 'more_body': True})
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+        await send({'type': 'http.response.body', 'body': b''})
+
+    def runs_inline(self, path, params):
+        """Whether a request is cheap enough to run on the event loop"""
+        if path not in self.async_paths or not INLINE_PARAMS.issuperset(params):
+            return False
+        for name in ('count', 'limit'):
+            value = params.get(name)
+            if value is not None and not (value.isdigit() and int(value) <= MAX_INLINE_ROWS):
+                return False
+        return True
+
+    def _call_wsgi(self, environ):
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = headers
+
+        chunks = self.flask_app.wsgi_app(environ, start_response)
+        return started['status'], started['headers'], chunks
+
+    def _call_wsgi_buffered(self, environ):
+        status, headers, chunks = self._call_wsgi(environ)
+        try:
+            return status, headers, [b''.join(chunks)]
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+def build_environ(scope, body):
+    """Translate an ASGI HTTP scope into a WSGI environ"""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+        'CONTENT_LENGTH': str(len(body))
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+async def _handle_connection(asgi_app, reader, writer):
+    """Serve HTTP/1.1 requests on one keep-alive connection"""
+    server = writer.get_extra_info('sockname')[:2]
+    client = writer.get_extra_info('peername')
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+
+            try:
+                lines = head.decode('latin-1').split('\r\n')
+                method, target, version = lines[0].split(' ', 2)
+                headers = []
+                for line in lines[1:]:
+                    if line:
+                        name, value = line.split(':', 1)
+                        headers.append((name.strip().lower().encode('latin-1'), value.strip().encode('latin-1')))
+            except ValueError:
+                writer.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+                return
+
+            header_map = dict(headers)
+            try:
+                length = int(header_map.get(b'content-length', b'0') or 0)
+                body = await reader.readexactly(length) if length else b''
+            except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+                return
+
+            path, _, query = target.partition('?')
+            http_version = version.split('/', 1)[-1]
+            connection = header_map.get(b'connection', b'').lower()
+            keep_alive = connection != b'close' and (http_version == '1.1' or connection == b'keep-alive')
+
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': http_version,
+                'method': method,
+                'scheme': 'http',
+                'path': unquote(path),
+                'raw_path': path.encode('latin-1'),
+                'query_string': query.encode('latin-1'),
+                'root_path': '',
+                'headers': headers,
+                'server': server,
+                'client': client
+            }
+            await _run_request(asgi_app, scope, body, writer, keep_alive, method == 'HEAD')
+            if not keep_alive:
+                return
+    finally:
+        writer.close()
+
+async def _run_request(asgi_app, scope, body, writer, keep_alive, head_only):
+    received = False
+    state = {'chunked': False}
+
+    async def receive():
+        nonlocal received
+        if received:
+            return {'type': 'http.disconnect'}
+        received = True
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            headers = message.get('headers', [])
+            names = {name.lower() for name, _ in headers}
+            lines = [f"HTTP/1.1 {message['status']} {_reason(message['status'])}"]
+            lines.extend(f"{name.decode('latin-1')}: {value.decode('latin-1')}" for name, value in headers)
+            if b'content-length' not in names and not head_only:
+                state['chunked'] = True
+                lines.append('Transfer-Encoding: chunked')
+            lines.append('Connection: keep-alive' if keep_alive else 'Connection: close')
+            writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        elif message['type'] == 'http.response.body' and not head_only:
+            chunk = message.get('body', b'')
+            if state['chunked']:
+                if chunk:
+                    writer.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+                if not message.get('more_body'):
+                    writer.write(b'0\r\n\r\n')
+            elif chunk:
+                writer.write(chunk)
+            await writer.drain()
+
+    await asgi_app(scope, receive, send)
+
+def _reason(status):
+    try:
+        return HTTPStatus(status).phrase
+    except ValueError:
+        return ''
+
+async def _serve(asgi_app, sock):
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_connection(asgi_app, reader, writer),
+        sock=sock, limit=MAX_HEADER_BYTES, backlog=4096
+    )
+    async with server:
+        await server.serve_forever()
+
+def serve_asyncio(flask_app, sock, threads=32):
+    """Serve `flask_app` through AsgiApp from an asyncio HTTP/1.1 server on `sock`"""
+    asyncio.run(_serve(AsgiApp(flask_app, threads=threads), sock))
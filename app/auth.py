@@ -1,17 +1,42 @@
 # app/auth.py
-from flask import request, jsonify, current_app
+from flask import request, jsonify, current_app, g
+from collections import OrderedDict
 from functools import wraps
 import base64
-import jwt
+import hashlib
 import datetime
 import secrets
+import threading
+import time
 from typing import Optional, Dict, Any, List
+from .token_store import TokenStore
+from .persistence import AdminKeyWriter
+
+# Verified JWTs without an exp claim are re-verified after this many seconds
+JWT_CACHE_DEFAULT_TTL = 300
+
+# Schemes each require_auth() type accepts
+ACCEPTED_SCHEMES = {
+    'any': ('jwt', 'api_key', 'basic', 'bearer'),
+    'jwt': ('jwt',),
+    'bearer': ('jwt', 'bearer'),
+    'api_key': ('api_key',),
+    'basic': ('basic',)
+}
 
 class AuthManager:
     def __init__(self, app=None):
         self.app = app
-        self.tokens = set()  
+        self.tokens = TokenStore()
+        self.api_key_ttl = None
         self.admin_api_keys = set() 
+        self._admin_keys_lock = threading.Lock()
+        self.admin_key_writer = AdminKeyWriter()
+        self.jwt_cache_size = 4096
+        self._jwt_cache = OrderedDict()
+        # Digests of tokens that failed verification, never decoded again
+        self._jwt_rejects = OrderedDict()
+        self._jwt_cache_lock = threading.Lock()
         
         if app is not None:
             self.init_app(app)
@@ -19,29 +44,30 @@ class AuthManager:
     def init_app(self, app):
         """Initialize with Flask app context"""
         self.app = app
+        self.jwt_cache_size = app.config.get('JWT_CACHE_SIZE', self.jwt_cache_size)
+        self.api_key_ttl = app.config.get('API_KEY_TTL') or None
+        max_tokens = app.config.get('MAX_TOKENS', 1_000_000)
+        if app.config.get('STATE_BACKEND', 'memory') == 'sqlite':
+            # Shared with sibling worker processes
+            from .shared_state import SqliteState, SqliteTokenStore, SqliteKeySet
+            state = SqliteState(app.config.get('STATE_PATH', 'mock-box-state.db'))
+            self.tokens = SqliteTokenStore(state, max_tokens=max_tokens)
+            self.admin_api_keys = SqliteKeySet(state)
+        else:
+            self.tokens = TokenStore(max_tokens=max_tokens)
+            self.admin_api_keys = set()
+        self.admin_key_writer.delay = app.config.get('ADMIN_KEYS_WRITE_DELAY', self.admin_key_writer.delay)
+        self.clear_jwt_cache()
         self.load_admin_keys()
         
     def load_admin_keys(self):
-        """Load admin-configured API keys from environment or config"""
+        """Load admin-configured API keys from app config ([auth] admin_api_keys, read by load_config)"""
         try:
-            # Try to get from app config first
             if self.app and hasattr(self.app, 'config'):
-                admin_keys_env = self.app.config.get('ADMIN_API_KEYS', '')
-                if admin_keys_env:
-                    keys = [key.strip() for key in admin_keys_env.split(',') if key.strip()]
-                    self.admin_api_keys.update(keys)
-            
-            # Load from config file
-            try:
-                from configparser import ConfigParser
-                config = ConfigParser()
-                config.read('config.ini')
-                if config.has_option('auth', 'admin_api_keys'):
-                    keys = [key.strip() for key in config.get('auth', 'admin_api_keys').split(',') if key.strip()]
+                admin_keys = self.app.config.get('ADMIN_API_KEYS', '')
+                if admin_keys:
+                    keys = [key.strip() for key in admin_keys.split(',') if key.strip()]
                     self.admin_api_keys.update(keys)
-            except Exception as e:
-                print(f"Warning: Could not load admin keys from config: {e}")
-                
         except Exception as e:
             print(f"Warning: Could not load admin keys: {e}")
     
@@ -58,31 +84,28 @@ class AuthManager:
     
     def add_admin_api_key(self, api_key: str):
         """Add an admin API key"""
-        self.admin_api_keys.add(api_key)
-        self.save_admin_keys()
+        with self._admin_keys_lock:
+            self.admin_api_keys.add(api_key)
+            self.save_admin_keys()
     
     def remove_admin_api_key(self, api_key: str):
         """Remove an admin API key"""
-        self.admin_api_keys.discard(api_key)
-        self.save_admin_keys()
+        with self._admin_keys_lock:
+            self.admin_api_keys.discard(api_key)
+            self.save_admin_keys()
     
     def save_admin_keys(self):
-        """Save admin keys to config file"""
-        try:
-            from configparser import ConfigParser
-            config = ConfigParser()
-            config.read('config.ini')
-            if not config.has_section('auth'):
-                config.add_section('auth')
-            config.set('auth', 'admin_api_keys', ','.join(self.admin_api_keys))
-            with open('config.ini', 'w') as configfile:
-                config.write(configfile)
-        except Exception as e:
-            print(f"Error saving admin keys: {e}")
+        """Queue admin keys to be written to the config file in the background"""
+        self.admin_key_writer.schedule(sorted(self.admin_api_keys))
+    
+    def flush_admin_keys(self):
+        """Write any queued admin key changes now"""
+        self.admin_key_writer.flush()
     
     def get_admin_api_keys(self) -> List[str]:
         """Get all admin API keys"""
-        return list(self.admin_api_keys)
+        with self._admin_keys_lock:
+            return list(self.admin_api_keys)
     
     def verify_api_key(self, api_key: str) -> bool:
         """Verify API key (both generated and admin keys)"""
@@ -91,6 +114,8 @@ class AuthManager:
     # JWT Token Methods
     def generate_jwt_token(self, payload: Dict[str, Any]) -> str:
         """Generate JWT token"""
+        # PyJWT is imported on first use to keep startup fast
+        import jwt
         payload.update({
             'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24),
             'iat': datetime.datetime.utcnow()
@@ -98,20 +123,62 @@ class AuthManager:
         return jwt.encode(payload, self.get_secret_key(), algorithm='HS256')
     
     def verify_jwt_token(self, token: str) -> Optional[Dict[str, Any]]:
-        """Verify JWT token"""
+        """
+        Verify JWT token, reusing the result of earlier verifications until the
+        token expires. Opaque tokens and tokens that already failed are
+        rejected without a decode.
+        """
+        # header.payload.signature; anything else cannot be a JWT
+        if token.count('.') != 2:
+            return None
+        digest = hashlib.sha256(token.encode('utf-8')).digest()
+        now = time.time()
+        
+        with self._jwt_cache_lock:
+            entry = self._jwt_cache.get(digest)
+            if entry is not None:
+                payload, expires_at = entry
+                if expires_at > now:
+                    self._jwt_cache.move_to_end(digest)
+                    return dict(payload)
+                del self._jwt_cache[digest]
+            if digest in self._jwt_rejects:
+                self._jwt_rejects.move_to_end(digest)
+                return None
+        
+        import jwt
         try:
             payload = jwt.decode(token, self.get_secret_key(), algorithms=['HS256'])
-            return payload
-        except jwt.ExpiredSignatureError:
+        except (jwt.InvalidSignatureError, jwt.DecodeError):
+            # Bad signatures and malformed tokens never become valid; others
+            # (e.g. nbf still in the future) may, so they are not remembered
+            self._remember(self._jwt_rejects, digest, True)
             return None
         except jwt.InvalidTokenError:
             return None
+        
+        self._remember(self._jwt_cache, digest, (dict(payload), payload.get('exp', now + JWT_CACHE_DEFAULT_TTL)))
+        return payload
+    
+    def _remember(self, cache, digest, value):
+        """Add to one of the bounded JWT caches"""
+        if self.jwt_cache_size > 0:
+            with self._jwt_cache_lock:
+                cache[digest] = value
+                while len(cache) > self.jwt_cache_size:
+                    cache.popitem(last=False)
+    
+    def clear_jwt_cache(self):
+        """Forget all cached JWT verifications"""
+        with self._jwt_cache_lock:
+            self._jwt_cache.clear()
+            self._jwt_rejects.clear()
     
     # API Key Methods
     def generate_api_key(self) -> str:
         """Generate random API key"""
         api_key = f"mock_{secrets.token_hex(16)}"
-        self.tokens.add(api_key)
+        self.tokens.add(api_key, ttl=self.api_key_ttl)
         return api_key
     
     # OAuth2 Methods
@@ -124,18 +191,71 @@ class AuthManager:
             'refresh_token': f"refresh_{secrets.token_hex(20)}",
             'scope': 'read write'
         }
-        self.tokens.add(token_data['access_token'])
+        self.tokens.add(token_data['access_token'], ttl=token_data['expires_in'])
         return token_data
 
 # Initialize auth manager (without loading admin keys yet)
 auth_manager = AuthManager()
 
+def _record_auth(scheme, started):
+    """Note the scheme a request authenticated with, and the time spent verifying it, for metrics"""
+    g.auth_type = scheme
+    g.auth_decode_time = time.perf_counter() - started
+
+# Credential checks: each returns the scheme it authenticated, or None
+def _check_jwt(credentials):
+    payload = auth_manager.verify_jwt_token(credentials)
+    # Downstream helpers reuse the decode instead of verifying again
+    g.jwt_payload = payload
+    if payload:
+        request.user = payload
+        return 'jwt'
+    return None
+
+def _check_api_key(credentials):
+    return 'api_key' if auth_manager.verify_api_key(credentials) else None
+
+def _check_basic(credentials):
+    # For Basic auth, we'll accept any credentials in mock server
+    try:
+        username, password = base64.b64decode(credentials).decode('utf-8').split(':', 1)
+    except ValueError:
+        return None
+    request.user = {'username': username, 'auth_type': 'basic'}
+    return 'basic'
+
+def _check_bearer(credentials):
+    # Generic bearer token (non-JWT)
+    return 'bearer' if auth_manager.verify_api_key(credentials) else None
+
+# Authorization header scheme and check for each scheme require_auth() accepts
+SCHEME_CHECKS = {
+    'jwt': ('Bearer', _check_jwt),
+    'api_key': ('ApiKey', _check_api_key),
+    'basic': ('Basic', _check_basic),
+    'bearer': ('Bearer', _check_bearer)
+}
+
+def auth_dispatch(auth_type):
+    """Map each Authorization header scheme to the checks an auth_type tries, in order"""
+    if auth_type not in ACCEPTED_SCHEMES:
+        raise ValueError(f"Unknown auth type '{auth_type}'")
+    dispatch = {}
+    for scheme in ACCEPTED_SCHEMES[auth_type]:
+        header_scheme, check = SCHEME_CHECKS[scheme]
+        dispatch[header_scheme] = dispatch.get(header_scheme, ()) + (check,)
+    return dispatch
+
 # Authentication decorators
 def require_auth(auth_type: str = 'any'):
     """
     Authentication decorator factory
     Supported auth_type: 'jwt', 'api_key', 'basic', 'bearer', 'any'
+    The checks for each header scheme are resolved here, once per view.
     """
+    dispatch = auth_dispatch(auth_type)
+    accepted = frozenset(ACCEPTED_SCHEMES[auth_type])
+
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
@@ -143,41 +263,35 @@ def require_auth(auth_type: str = 'any'):
             if request.method == 'OPTIONS':
                 return f(*args, **kwargs)
             
+            # Sub-requests of /api/batch reuse the batch request's authentication
+            batch_auth = g.get('batch_auth')
+            if batch_auth is not None:
+                scheme, user = batch_auth
+                if scheme not in accepted:
+                    return jsonify({'error': 'Invalid authentication'}), 401
+                if user is not None:
+                    request.user = user
+                return f(*args, **kwargs)
+            
             auth_header = request.headers.get('Authorization')
             
             if not auth_header:
+                g.auth_type = 'missing'
                 return jsonify({'error': 'Authorization header required'}), 401
             
-            if auth_type in ['any', 'jwt', 'bearer'] and auth_header.startswith('Bearer '):
-                token = auth_header[7:]  # Remove 'Bearer ' prefix
-                payload = auth_manager.verify_jwt_token(token)
-                if payload:
-                    request.user = payload
-                    return f(*args, **kwargs)
-            
-            if auth_type in ['any', 'api_key'] and auth_header.startswith('ApiKey '):
-                api_key = auth_header[7:]  # Remove 'ApiKey ' prefix
-                if auth_manager.verify_api_key(api_key):
-                    return f(*args, **kwargs)
-            
-            if auth_type in ['any', 'basic'] and auth_header.startswith('Basic '):
-                # For Basic auth, we'll accept any credentials in mock server
-                try:
-                    credentials = base64.b64decode(auth_header[6:]).decode('utf-8')
-                    username, password = credentials.split(':', 1)
-                    request.user = {'username': username, 'auth_type': 'basic'}
-                    return f(*args, **kwargs)
-                except:
-                    pass
-            
-            if auth_type in ['any', 'bearer'] and auth_header.startswith('Bearer '):
-                # Generic bearer token (non-JWT)
-                token = auth_header[7:]
-                if auth_manager.verify_api_key(token):
+            started = time.perf_counter()
+            header_scheme, _, credentials = auth_header.partition(' ')
+            for check in dispatch.get(header_scheme, ()):
+                scheme = check(credentials)
+                if scheme is not None:
+                    _record_auth(scheme, started)
                     return f(*args, **kwargs)
             
+            _record_auth('invalid', started)
             return jsonify({'error': 'Invalid authentication'}), 401
         
+        # Lets tooling (e.g. the bench command) see which schemes a view accepts
+        decorated_function.auth_type = auth_type
         return decorated_function
     return decorator
 
@@ -0,0 +1,222 @@
+# app/bench.py
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import base64
+import http.client
+import json
+import logging
+import math
+import threading
+import time
+
+# Schemes exercised for each require_auth() type
+AUTH_VARIANTS = {
+    'any': ['jwt', 'api_key', 'basic', 'bearer'],
+    'jwt': ['jwt'],
+    'bearer': ['jwt', 'bearer'],
+    'api_key': ['api_key'],
+    'basic': ['basic']
+}
+
+# Query strings for routes that answer 400 without parameters; one target each
+TARGET_QUERIES = {
+    '/api/data': ['type=numbers', 'type=names']
+}
+
+# Routes whose intended answer is an error; only other statuses count as errors
+EXPECTED_STATUS = {
+    '/api/error': 500
+}
+
+# Token-minting routes that need a request body
+POST_TARGETS = [
+    ('POST', '/api/auth/jwt-token', None),
+    ('POST', '/api/auth/oauth-token', None)
+]
+
+def discover_targets(app):
+    """
+    Return (method, path, auth variant) for every parameterless GET route
+    under /api, once per auth scheme the route accepts and per query in
+    TARGET_QUERIES, plus POST_TARGETS.
+    """
+    targets = []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        if not rule.rule.startswith('/api/') or rule.arguments or 'GET' not in rule.methods:
+            continue
+        auth_type = getattr(app.view_functions[rule.endpoint], 'auth_type', None)
+        for query in TARGET_QUERIES.get(rule.rule, [None]):
+            path = f'{rule.rule}?{query}' if query else rule.rule
+            for variant in AUTH_VARIANTS.get(auth_type, [None]):
+                targets.append(('GET', path, variant))
+    return targets + POST_TARGETS
+
+def target_name(method, path, variant):
+    name = f'{method} {path}'
+    return f'{name} [{variant}]' if variant else name
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(pct / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+class Bench:
+    """Drives HTTP requests at a running Mock-Box server and reports throughput and latency"""
+
+    def __init__(self, base_url, concurrency=8, requests=200):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.concurrency = concurrency
+        self.requests = requests
+        self.credentials = {}
+
+    def _request(self, conn, method, path, headers=None, body=None):
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, response.read()
+
+    def login(self):
+        """Mint one credential per auth scheme"""
+        conn = http.client.HTTPConnection(self.host, self.port)
+        json_headers = {'Content-Type': 'application/json'}
+        _, body = self._request(conn, 'GET', '/api/auth/api-key')
+        api_key = json.loads(body)['api_key']
+        _, body = self._request(conn, 'POST', '/api/auth/jwt-token', json_headers, b'{}')
+        jwt_token = json.loads(body)['access_token']
+        _, body = self._request(conn, 'POST', '/api/auth/oauth-token', json_headers, b'{}')
+        oauth_token = json.loads(body)['access_token']
+        conn.close()
+
+        self.credentials = {
+            'jwt': f'Bearer {jwt_token}',
+            'api_key': f'ApiKey {api_key}',
+            'basic': 'Basic ' + base64.b64encode(b'bench:bench').decode('ascii'),
+            'bearer': f'Bearer {oauth_token}'
+        }
+
+    def run_target(self, method, path, variant):
+        """Send `requests` requests over `concurrency` keep-alive connections"""
+        headers = {'Content-Type': 'application/json'}
+        if variant:
+            headers['Authorization'] = self.credentials[variant]
+        body = b'{}' if method == 'POST' else None
+        expected = EXPECTED_STATUS.get(path.partition('?')[0])
+
+        latencies = []
+        errors = 0
+        lock = threading.Lock()
+        remaining = [self.requests]
+
+        def worker():
+            nonlocal errors
+            conn = http.client.HTTPConnection(self.host, self.port)
+            local_latencies, local_errors = [], 0
+            while True:
+                with lock:
+                    if remaining[0] <= 0:
+                        break
+                    remaining[0] -= 1
+                start = time.perf_counter()
+                try:
+                    status, _ = self._request(conn, method, path, headers, body)
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    conn = http.client.HTTPConnection(self.host, self.port)
+                    status = 0
+                local_latencies.append(time.perf_counter() - start)
+                if status == 0 or (status != expected if expected else status >= 400):
+                    local_errors += 1
+            conn.close()
+            with lock:
+                latencies.extend(local_latencies)
+                errors += local_errors
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for _ in range(self.concurrency):
+                pool.submit(worker)
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 3)
+        }
+
+    def run(self, targets):
+        self.login()
+        return {target_name(*target): self.run_target(*target) for target in targets}
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compare results with a baseline report. A target regresses when its
+    req/s drops, or its p99 grows, by more than `tolerance`.
+    """
+    regressions = {}
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        problems = []
+        if previous['rps'] and result['rps'] < previous['rps'] * (1 - tolerance):
+            problems.append(f"rps {previous['rps']} -> {result['rps']}")
+        if previous['p99_ms'] and result['p99_ms'] > previous['p99_ms'] * (1 + tolerance):
+            problems.append(f"p99_ms {previous['p99_ms']} -> {result['p99_ms']}")
+        if problems:
+            regressions[name] = problems
+    return regressions
+
+def start_server(app, threads):
+    """Serve `app` on an ephemeral local port from a background thread"""
+    from .serve import PooledWSGIServer
+    server = PooledWSGIServer('127.0.0.1', 0, app, threads=threads)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run_bench(concurrency=8, requests=200, url=None, match=None, baseline=None,
+              save_baseline=None, tolerance=0.2, output=None):
+    """
+    Benchmark every /api route and print a JSON report.
+    Returns the process exit status: 1 when a baseline comparison finds regressions.
+    """
+    from . import create_app
+    app = create_app({'DEBUG': False})
+    app.logger.setLevel(logging.WARNING)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    server = None
+    if url is None:
+        server = start_server(app, threads=concurrency)
+        url = f'http://127.0.0.1:{server.port}'
+
+    targets = [target for target in discover_targets(app) if not match or match in target[1]]
+    try:
+        results = Bench(url, concurrency=concurrency, requests=requests).run(targets)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    report = {'concurrency': concurrency, 'requests_per_target': requests, 'results': results}
+    status = 0
+    if baseline:
+        with open(baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f)['results'], tolerance)
+        report['regressions'] = regressions
+        status = 1 if regressions else 0
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    if save_baseline:
+        with open(save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'results': results}, f, indent=2, sort_keys=True)
+    return status
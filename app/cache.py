@@ -0,0 +1,120 @@
+# app/cache.py
+from flask import Response, current_app, make_response, request
+from collections import OrderedDict
+from functools import wraps
+import hashlib
+import threading
+from .compression import compress, negotiate, should_compress
+from .dataset import current_seed
+from .streaming import stream_mode
+
+# Response headers worth replaying from a cached entry
+_REPLAYED_HEADERS = ('Content-Type', 'X-Total-Count', 'X-Next-Cursor', 'Link')
+
+class CachedEntry:
+    """
+    An already-encoded response body with its strong ETag, and the body
+    compressed in each Content-Encoding requested so far
+    """
+    __slots__ = ('body', 'status', 'headers', 'etag', 'mimetype', 'compressed')
+
+    def __init__(self, body, status, headers, mimetype=None):
+        self.body = body
+        self.status = status
+        self.headers = headers
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.mimetype = mimetype
+        self.compressed = {}
+
+    def encoded(self, encoding):
+        """The body in `encoding`, compressed on first use only"""
+        body = self.compressed.get(encoding)
+        if body is None:
+            body = self.compressed[encoding] = compress(self.body, encoding)
+        return body
+
+class ResponseCache:
+    """Thread-safe LRU of pre-serialized responses"""
+
+    def __init__(self, max_entries=256, max_entry_bytes=1 << 20):
+        self.max_entries = max_entries
+        self.max_entry_bytes = max_entry_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        if len(entry.body) > self.max_entry_bytes:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+def init_cache(app):
+    """Attach a response cache to the app when enabled in config"""
+    if app.config.get('CACHE_ENABLED', True):
+        app.extensions['response_cache'] = ResponseCache(
+            max_entries=app.config.get('CACHE_MAX_ENTRIES', 256),
+            max_entry_bytes=app.config.get('CACHE_MAX_ENTRY_BYTES', 1 << 20)
+        )
+
+def cached_response(seeded=False, validator=None):
+    """
+    Cache a view's encoded response, keyed by route, query and seed, and
+    answer If-None-Match with 304.
+    seeded: only cache when the request has a seed, i.e. its data is deterministic
+    validator: callable whose return value is part of the key (e.g. a file mtime);
+               returning None skips the cache for that request
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            cache = current_app.extensions.get('response_cache')
+            if cache is None or stream_mode() is not None:
+                return f(*args, **kwargs)
+
+            seed = current_seed() if seeded else None
+            version = validator() if validator else None
+            if (seeded and seed is None) or (validator and version is None):
+                return f(*args, **kwargs)
+
+            key = (request.endpoint, request.host_url, tuple(sorted(request.args.items(multi=True))), seed, version)
+            entry = cache.get(key)
+            if entry is None:
+                response = make_response(f(*args, **kwargs))
+                if response.is_streamed:
+                    return response
+                headers = [(name, response.headers[name]) for name in _REPLAYED_HEADERS if name in response.headers]
+                entry = CachedEntry(response.get_data(), response.status_code, headers, response.mimetype)
+                cache.put(key, entry)
+
+            # Compressed here rather than by the compression hook, so repeats reuse the bytes
+            compressible = should_compress(entry.mimetype, len(entry.body))
+            encoding = negotiate(request.accept_encodings) if compressible else None
+            body = entry.body if encoding is None else entry.encoded(encoding)
+            response = Response(body, status=entry.status, headers=entry.headers)
+            response.set_etag(entry.etag if encoding is None else f'{entry.etag}-{encoding}')
+            if encoding is not None:
+                response.headers['Content-Encoding'] = encoding
+            if compressible:
+                response.vary.add('Accept-Encoding')
+            if 200 <= entry.status < 300:
+                response.make_conditional(request)
+            return response
+        return decorated_function
+    return decorator
@@ -0,0 +1,277 @@
+# app/columnar.py
+"""
+Compact column storage for materialized datasets.
+
+Each field of a resource is held in one typed column: numbers in array
+buffers, enums and other repeated values as small integer codes into a
+dictionary, and row numbers not at all. A row only becomes a dict when it
+is serialized.
+"""
+from array import array
+from datetime import datetime, timedelta
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Returned by Column.parse() for a query value the column can never hold
+NO_MATCH = object()
+
+# Dictionary columns holding more distinct values become string columns
+MAX_DICTIONARY_SIZE = 65536
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+class Column:
+    """Base column; subclasses store values in `data`"""
+    kind = 'column'
+
+    def __len__(self):
+        return len(self.data)
+
+    def parse(self, text):
+        """Convert a query string value to this column's type"""
+        return text
+
+    @property
+    def nbytes(self):
+        return self.data.itemsize * len(self.data)
+
+class RowNumberColumn(Column):
+    """Values derived from the row number (id fields); nothing is stored"""
+    kind = 'row_number'
+
+    def __init__(self, start=1):
+        self.start = start
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def append(self, value):
+        self.length += 1
+
+    def __getitem__(self, position):
+        return self.start + position
+
+    def parse(self, text):
+        try:
+            return int(text)
+        except ValueError:
+            return NO_MATCH
+
+    @property
+    def nbytes(self):
+        return 0
+
+class IntColumn(Column):
+    kind = 'int'
+
+    def __init__(self, data=None):
+        self.data = array('q') if data is None else data
+        # Columns over a mapped snapshot are read-only
+        if hasattr(self.data, 'append'):
+            self.append = self.data.append
+
+    def __getitem__(self, position):
+        return self.data[position]
+
+    def parse(self, text):
+        try:
+            return int(text)
+        except ValueError:
+            return NO_MATCH
+
+    def compact(self):
+        """Narrow the array to the smallest integer type holding every value"""
+        if not self.data:
+            return
+        low, high = min(self.data), max(self.data)
+        for typecode in ('b', 'h', 'i'):
+            bits = array(typecode).itemsize * 8 - 1
+            if -(1 << bits) <= low and high < (1 << bits):
+                self.data = array(typecode, self.data)
+                self.append = self.data.append
+                return
+
+class FloatColumn(Column):
+    kind = 'float'
+
+    def __init__(self, data=None):
+        self.data = array('d') if data is None else data
+        if hasattr(self.data, 'append'):
+            self.append = self.data.append
+
+    def __getitem__(self, position):
+        return self.data[position]
+
+    def parse(self, text):
+        try:
+            return float(text)
+        except ValueError:
+            return NO_MATCH
+
+class BoolColumn(Column):
+    kind = 'bool'
+
+    def __init__(self, data=None):
+        self.data = array('b') if data is None else data
+
+    def append(self, value):
+        self.data.append(1 if value else 0)
+
+    def __getitem__(self, position):
+        return self.data[position] == 1
+
+    def parse(self, text):
+        return {'true': True, 'false': False, '1': True, '0': False}.get(text.lower(), NO_MATCH)
+
+class DateTimeColumn(Column):
+    """Naive datetimes as microseconds since the epoch"""
+    kind = 'datetime'
+
+    def __init__(self, data=None):
+        self.data = array('q') if data is None else data
+
+    @staticmethod
+    def encode(value):
+        return (value - EPOCH) // MICROSECOND
+
+    def append(self, value):
+        self.data.append((value - EPOCH) // MICROSECOND)
+
+    def __getitem__(self, position):
+        return EPOCH + timedelta(microseconds=self.data[position])
+
+class ConstColumn(Column):
+    """The same value in every row; nothing is stored"""
+    kind = 'const'
+
+    def __init__(self, value=None):
+        self.value = value
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def append(self, value):
+        self.length += 1
+
+    def __getitem__(self, position):
+        return self.value
+
+    def parse(self, text):
+        return self.value if _text(self.value) == text else NO_MATCH
+
+    @property
+    def nbytes(self):
+        return 0
+
+class DictionaryColumn(Column):
+    """Repeated values as codes into a list of distinct values"""
+    kind = 'dictionary'
+
+    def __init__(self, values=None, codes=None):
+        self.values = [] if values is None else values
+        self.codes = array('B') if codes is None else codes
+        self._lookup = {value: code for code, value in enumerate(self.values)}
+
+    @property
+    def data(self):
+        return self.codes
+
+    def append(self, value):
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self.values)
+            self.values.append(value)
+            if code > 255 and self.codes.typecode == 'B':
+                self.codes = array('I', self.codes)
+        self.codes.append(code)
+
+    def __getitem__(self, position):
+        return self.values[self.codes[position]]
+
+    def code_of(self, value):
+        return self._lookup.get(value)
+
+    def parse(self, text):
+        # Values keep their JSON type; match the query text against their string form
+        by_text = {_text(value): value for value in self.values}
+        return by_text.get(text, NO_MATCH)
+
+    def spills(self):
+        """Whether the dictionary has just outgrown its use and holds only strings"""
+        return len(self.values) == MAX_DICTIONARY_SIZE + 1 and all(isinstance(value, str) for value in self.values)
+
+    def to_strings(self):
+        column = StringColumn()
+        for position in range(len(self.codes)):
+            column.append(self[position])
+        return column
+
+class StringColumn(Column):
+    """Distinct strings as one UTF-8 buffer plus end offsets"""
+    kind = 'string'
+
+    def __init__(self, blob=None, offsets=None):
+        self.blob = bytearray() if blob is None else blob
+        self.offsets = array('Q') if offsets is None else offsets
+
+    @property
+    def data(self):
+        return self.offsets
+
+    def append(self, value):
+        self.blob += value.encode('utf-8')
+        self.offsets.append(len(self.blob))
+
+    def __getitem__(self, position):
+        start = self.offsets[position - 1] if position else 0
+        return str(self.blob[start:self.offsets[position]], 'utf-8')
+
+    @property
+    def nbytes(self):
+        return len(self.blob) + self.offsets.itemsize * len(self.offsets)
+
+def _text(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+def column_for(spec):
+    """Empty column suited to a schema field spec"""
+    kind = spec.get('type')
+    if kind == 'id':
+        return RowNumberColumn(int(spec.get('start', 1)))
+    if kind in ('int', 'ref'):
+        return IntColumn()
+    if kind == 'float':
+        return FloatColumn()
+    if kind == 'bool':
+        return BoolColumn()
+    if kind == 'datetime' and not spec.get('format'):
+        return DateTimeColumn()
+    if kind == 'const':
+        return ConstColumn(spec.get('value'))
+    # enum, cycle, lookup, string and formatted datetimes
+    return DictionaryColumn()
+
+def positions_array(positions=()):
+    """Array of row positions"""
+    return array('I', positions)
+
+def argsort(column):
+    """Row positions ordered by the column's values (stable)"""
+    if numpy is not None and isinstance(column, (IntColumn, FloatColumn, DateTimeColumn)):
+        order = numpy.frombuffer(column.data, dtype=column.data.typecode).argsort(kind='stable')
+        positions = positions_array()
+        positions.frombytes(order.astype('uint32').tobytes())
+        return positions
+    if isinstance(column, (IntColumn, FloatColumn, DateTimeColumn)):
+        key = column.data.__getitem__
+    else:
+        key = column.__getitem__
+    return positions_array(sorted(range(len(column)), key=key))
@@ -0,0 +1,135 @@
+# app/compression.py
+"""
+Content-Encoding negotiation, encoders and the response compression hook.
+
+gzip is always available; brotli and zstd are used when the `brotli` and
+`zstandard` packages are installed.
+"""
+from flask import current_app, request
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Levels per encoder: (per response, once for content served many times)
+GZIP_LEVELS = (6, 9)
+BROTLI_QUALITIES = (5, 11)
+ZSTD_LEVELS = (3, 19)
+
+# Media types worth compressing, besides text/*
+COMPRESSIBLE_TYPES = frozenset((
+    'application/json', 'application/x-ndjson', 'application/javascript', 'application/xml'
+))
+
+def _gzip(data, best=False):
+    # mtime=0 keeps the output, and so ETags, identical across runs
+    return gzip.compress(data, compresslevel=GZIP_LEVELS[best], mtime=0)
+
+def _gzip_stream():
+    compressor = zlib.compressobj(GZIP_LEVELS[0], zlib.DEFLATED, 31)
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+def _brotli(data, best=False):
+    return brotli.compress(data, quality=BROTLI_QUALITIES[best])
+
+def _brotli_stream():
+    compressor = brotli.Compressor(quality=BROTLI_QUALITIES[0])
+    return compressor.process, compressor.flush, compressor.finish
+
+def _zstd(data, best=False):
+    return zstandard.ZstdCompressor(level=ZSTD_LEVELS[best]).compress(data)
+
+def _zstd_stream():
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVELS[0]).compressobj()
+    return (compressor.compress, lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH))
+
+# (one-shot encoder, streaming encoder factory) by Content-Encoding token, in order of preference
+ENCODERS = {}
+if zstandard is not None:
+    ENCODERS['zstd'] = (_zstd, _zstd_stream)
+if brotli is not None:
+    ENCODERS['br'] = (_brotli, _brotli_stream)
+ENCODERS['gzip'] = (_gzip, _gzip_stream)
+
+def negotiate(accept_encodings, available=None):
+    """
+    Best Content-Encoding of `available` (default: every installed encoder)
+    for a request's parsed Accept-Encoding, or None for identity.
+    """
+    best, best_quality = None, 0
+    for encoding in (ENCODERS if available is None else available):
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def compress(data, encoding, best=False):
+    """Encode `data`; `best` trades time for size, for bodies compressed once and served often"""
+    return ENCODERS[encoding][0](data, best)
+
+def compress_stream(chunks, encoding):
+    """
+    Encode a streamed body chunk by chunk, flushing after each one so the
+    client receives rows as they are generated.
+    """
+    encode, flush, finish = ENCODERS[encoding][1]()
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = encode(chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def compressible(mimetype):
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES or mimetype.endswith(('+json', '+xml'))
+
+def should_compress(mimetype, size=None):
+    """Whether a body of `size` bytes (None: streamed) is compressed for clients accepting it"""
+    config = current_app.config
+    if not config.get('COMPRESSION_ENABLED', True) or not mimetype or not compressible(mimetype):
+        return False
+    return size is None or size >= config.get('COMPRESSION_MIN_SIZE', 1024)
+
+def compress_response(response):
+    """after_request hook: compress the body in the negotiated encoding"""
+    if (response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers or response.direct_passthrough):
+        return response
+    streamed = response.is_streamed
+    if not should_compress(response.mimetype, None if streamed else len(response.get_data())):
+        return response
+    # The representation depends on Accept-Encoding even when it is identity
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f'{etag}-{encoding}')
+    if streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        response.set_data(compress(response.get_data(), encoding))
+    return response
+
+def init_compression(app):
+    """Install the compression hook; it runs before the other after_request hooks"""
+    if app.config.get('COMPRESSION_ENABLED', True):
+        app.after_request(compress_response)
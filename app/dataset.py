@@ -0,0 +1,103 @@
+# app/dataset.py
+from flask import current_app
+from datetime import datetime
+import hashlib
+import secrets
+
+MASK64 = (1 << 64) - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+# Seeded rows are dated relative to a fixed point so repeated runs are byte-identical
+REFERENCE_TIME = datetime(2024, 1, 1)
+
+# All resources built on the engine, by name
+RESOURCES = {}
+
+def mix64(value):
+    """SplitMix64 finalizer: a bijective 64-bit hash"""
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+def resource_key(seed, resource):
+    """Derive the 64-bit key of a resource; an unseeded key is random"""
+    if seed is None:
+        return secrets.randbits(64)
+    digest = hashlib.blake2b(f'{seed}:{resource}'.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+def counter_hash(key, index):
+    """Hash of (key, index); the basis of every per-row random stream"""
+    return mix64(key ^ ((index * GOLDEN_GAMMA) & MASK64))
+
+def current_seed():
+    """Seed for this request: ?seed=, then [data] seed from config.ini, else None"""
+    # pagination imports this module; a malformed seed is a 400 like a bad limit
+    from .pagination import int_arg
+    seed = int_arg('seed', None)
+    if seed is None:
+        seed = current_app.config.get('DATA_SEED')
+    return seed
+
+class RowRandom:
+    """Counter-based random stream for one row, independent of every other row"""
+    __slots__ = ('_state',)
+
+    def __init__(self, key, index):
+        self._state = counter_hash(key, index)
+
+    def _next(self):
+        self._state = (self._state + GOLDEN_GAMMA) & MASK64
+        return mix64(self._state)
+
+    def random(self):
+        return (self._next() >> 11) * (1.0 / (1 << 53))
+
+    def randint(self, a, b):
+        return a + self._next() % (b - a + 1)
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.random()
+
+    def choice(self, seq):
+        return seq[self._next() % len(seq)]
+
+class Resource:
+    """
+    A virtual table whose row i is a pure function of (seed, resource, i).
+    `make_row(rnd, index, now)` builds a row from its RowRandom stream and
+    the reference time, so any row can be produced without the ones before it.
+    `total` is the default number of rows served per listing.
+    `make_keyed_row(key, index, now)`, when given, must build the same row as
+    make_row from the resource key directly; listings prefer it.
+    """
+
+    def __init__(self, name, make_row, total, make_keyed_row=None):
+        self.name = name
+        self.make_row = make_row
+        self.make_keyed_row = make_keyed_row
+        self.total = total
+        RESOURCES[name] = self
+
+    def _context(self, seed):
+        now = datetime.now() if seed is None else REFERENCE_TIME
+        return resource_key(seed, self.name), now
+
+    def row(self, index, seed=None):
+        """Return row `index` for `seed`"""
+        key, now = self._context(seed)
+        return self.make_row(RowRandom(key, index), index, now)
+
+    def iter_rows(self, seed=None, start=0, stop=None):
+        """Lazily yield rows [start, stop) for `seed`; cost is O(stop - start)"""
+        key, now = self._context(seed)
+        if stop is None:
+            stop = self.total
+        if self.make_keyed_row is not None:
+            make_keyed_row = self.make_keyed_row
+            for index in range(start, stop):
+                yield make_keyed_row(key, index, now)
+            return
+        make_row = self.make_row
+        for index in range(start, stop):
+            yield make_row(RowRandom(key, index), index, now)
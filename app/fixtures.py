@@ -0,0 +1,257 @@
+# app/fixtures.py
+"""
+Recorded responses, replayed alongside the generated ones.
+
+Fixtures live in an append-only data file of records:
+
+    key (16 bytes) | status (u16) | headers length (u32) | body length (u32) | headers JSON | body
+
+and an index file next to it (`<path>.idx`), an open-addressing hash table
+of (key, record offset + 1) slots. Both are memory-mapped, so opening a
+store costs the same for ten fixtures or a million, and a lookup is one
+hash, a short probe and a slice of the map. The key hashes the method,
+path, sorted query string and the configured request headers.
+"""
+from flask import Blueprint, Response, current_app, jsonify, request
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import urllib.parse
+
+DATA_MAGIC = b'MBXFIX01'
+INDEX_MAGIC = b'MBXIDX01'
+RECORD = struct.Struct('<16sHII')
+INDEX_HEADER = struct.Struct('<8sQQQ')
+SLOT = struct.Struct('<16sQ')
+MIN_CAPACITY = 1024
+
+# Not replayed: they describe the recorded connection, not the response
+HOP_HEADERS = frozenset((
+    'connection', 'keep-alive', 'transfer-encoding', 'content-length', 'content-encoding',
+    'date', 'server', 'upgrade', 'proxy-authenticate', 'trailer'
+))
+
+def request_key(method, path, query_pairs, header_values=()):
+    """16-byte fixture key of a request"""
+    query = urllib.parse.urlencode(sorted(query_pairs))
+    raw = '\0'.join((method.upper(), path, query, *header_values))
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).digest()
+
+class Fixture:
+    """A recorded response; `body` is a view into the mapped data file"""
+    __slots__ = ('status', 'headers', 'body')
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+class FixtureStore:
+    """
+    Memory-mapped fixture file and index. Lookups take no lock; appending
+    (record mode) is serialized and only meant for a single process.
+    """
+
+    def __init__(self, path, writable=False):
+        self.path = path
+        self.index_path = path + '.idx'
+        self.writable = writable
+        self._lock = threading.Lock()
+        self._data = self._index = None
+        self._capacity = self._count = 0
+        if writable and not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(DATA_MAGIC)
+        if os.path.exists(path):
+            self._open()
+
+    def __len__(self):
+        return self._count
+
+    def _map(self, path, write=False):
+        with open(path, 'r+b' if write else 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if write else mmap.ACCESS_READ)
+
+    def _open(self):
+        data = self._map(self.path)
+        if data[:len(DATA_MAGIC)] != DATA_MAGIC:
+            raise ValueError(f'{self.path} is not a fixture file')
+        self._data = data
+        index = self._map(self.index_path, self.writable) if os.path.exists(self.index_path) else None
+        if index is not None and len(index) >= INDEX_HEADER.size:
+            magic, capacity, count, covered = INDEX_HEADER.unpack_from(index)
+            if magic == INDEX_MAGIC and covered == len(data):
+                self._index, self._capacity, self._count = index, capacity, count
+                return
+        # Missing, or behind the data file after an interrupted write
+        self._rebuild()
+
+    def _records(self):
+        """(key, offset) of every record in file order"""
+        data = self._data
+        offset = len(DATA_MAGIC)
+        while offset + RECORD.size <= len(data):
+            key, _, headers_length, body_length = RECORD.unpack_from(data, offset)
+            end = offset + RECORD.size + headers_length + body_length
+            if end > len(data):
+                break
+            yield key, offset
+            offset = end
+
+    def _rebuild(self, capacity=None):
+        """Write a fresh index covering the whole data file"""
+        records = dict(self._records())
+        if capacity is None:
+            capacity = MIN_CAPACITY
+            while capacity < 2 * len(records):
+                capacity *= 2
+        table = bytearray(INDEX_HEADER.size + capacity * SLOT.size)
+        INDEX_HEADER.pack_into(table, 0, INDEX_MAGIC, capacity, len(records), len(self._data))
+        mask = capacity - 1
+        for key, offset in records.items():
+            slot = int.from_bytes(key[:8], 'little') & mask
+            while SLOT.unpack_from(table, INDEX_HEADER.size + slot * SLOT.size)[1]:
+                slot = (slot + 1) & mask
+            SLOT.pack_into(table, INDEX_HEADER.size + slot * SLOT.size, key, offset + 1)
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(table)
+        os.replace(temp_path, self.index_path)
+        self._index = self._map(self.index_path, self.writable)
+        self._capacity, self._count = capacity, len(records)
+
+    def _find(self, key):
+        """(slot, record offset) of a key, or (free slot, None)"""
+        index, mask = self._index, self._capacity - 1
+        slot = int.from_bytes(key[:8], 'little') & mask
+        while True:
+            found, offset = SLOT.unpack_from(index, INDEX_HEADER.size + slot * SLOT.size)
+            if not offset:
+                return slot, None
+            if found == key:
+                return slot, offset - 1
+            slot = (slot + 1) & mask
+
+    def get(self, key):
+        if self._index is None:
+            return None
+        if self.writable:
+            with self._lock:
+                return self._get(key)
+        return self._get(key)
+
+    def _get(self, key):
+        _, offset = self._find(key)
+        if offset is None:
+            return None
+        data = self._data
+        _, status, headers_length, body_length = RECORD.unpack_from(data, offset)
+        start = offset + RECORD.size
+        headers = json.loads(bytes(data[start:start + headers_length]))
+        start += headers_length
+        return Fixture(status, headers, memoryview(data)[start:start + body_length])
+
+    def append(self, key, status, headers, body):
+        """Record a response; a later record for the same key replaces the earlier one"""
+        if not self.writable:
+            raise ValueError('fixture store is read-only')
+        raw_headers = json.dumps(headers).encode('utf-8')
+        record = RECORD.pack(key, status, len(raw_headers), len(body)) + raw_headers + body
+        with self._lock:
+            with open(self.path, 'ab') as f:
+                offset = f.tell()
+                f.write(record)
+            self._data = self._map(self.path)
+            if self._index is None or 2 * (self._count + 1) > self._capacity:
+                self._rebuild(max(MIN_CAPACITY, 2 * self._capacity))
+                return
+            slot, previous = self._find(key)
+            SLOT.pack_into(self._index, INDEX_HEADER.size + slot * SLOT.size, key, offset + 1)
+            if previous is None:
+                self._count += 1
+            INDEX_HEADER.pack_into(self._index, 0, INDEX_MAGIC, self._capacity, self._count, len(self._data))
+
+def write_fixtures(path, fixtures):
+    """
+    Append (key, status, headers, body) tuples to a fixture file in one pass
+    and index them; faster than FixtureStore.append for bulk imports.
+    """
+    new = not os.path.exists(path)
+    with open(path, 'ab') as f:
+        if new:
+            f.write(DATA_MAGIC)
+        for key, status, headers, body in fixtures:
+            raw_headers = json.dumps(headers).encode('utf-8')
+            f.write(RECORD.pack(key, status, len(raw_headers), len(body)) + raw_headers + body)
+    # The index no longer covers the data file, so opening rebuilds it
+    FixtureStore(path, writable=True)
+
+def current_key():
+    """Fixture key of the current request"""
+    header_values = [request.headers.get(name, '') for name in current_app.config.get('REPLAY_MATCH_HEADERS', [])]
+    return request_key(request.method, request.path, request.args.items(multi=True), header_values)
+
+def fixture_response(fixture):
+    # PEP 3333 bodies must be bytes, so the mapped body is copied once here
+    return Response(bytes(fixture.body), status=fixture.status, headers=fixture.headers)
+
+def proxy_upstream(upstream):
+    """Forward the current request to `upstream`; return (status, headers, body)"""
+    # Only record mode needs an HTTP client (and ssl)
+    import urllib.error
+    import urllib.request
+    url = upstream.rstrip('/') + request.full_path.rstrip('?')
+    headers = {
+        name: value for name, value in request.headers.items()
+        if name.lower() not in HOP_HEADERS and name.lower() not in ('host', 'accept-encoding')
+    }
+    upstream_request = urllib.request.Request(url, data=request.get_data() or None, headers=headers, method=request.method)
+    try:
+        with urllib.request.urlopen(upstream_request, timeout=30) as upstream_response:
+            return upstream_response.status, upstream_response.headers.items(), upstream_response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.items(), e.read()
+
+replay_bp = Blueprint('replay', __name__)
+
+@replay_bp.before_app_request
+def replay_fixture():
+    """Serve a recorded response when one matches; otherwise fall through to the routes"""
+    store = current_app.extensions['fixtures']
+    key = current_key()
+    if current_app.config.get('REPLAY_MODE') != 'record':
+        fixture = store.get(key)
+        return None if fixture is None else fixture_response(fixture)
+
+    try:
+        status, headers, body = proxy_upstream(current_app.config['REPLAY_UPSTREAM'])
+    except OSError as e:
+        return jsonify({'error': f'Upstream request failed: {e}'}), 502
+    headers = [[name, value] for name, value in headers if name.lower() not in HOP_HEADERS]
+    store.append(key, status, headers, body)
+    return Response(body, status=status, headers=headers)
+
+def init_replay(app):
+    """Open the [replay] fixture file and register the replay hook"""
+    mode = app.config.get('REPLAY_MODE', 'off')
+    if mode == 'off':
+        return
+    if mode not in ('replay', 'record'):
+        print(f"Warning: Unknown replay mode '{mode}'; replay disabled")
+        return
+    if mode == 'record' and not app.config.get('REPLAY_UPSTREAM'):
+        print("Warning: [replay] record mode needs an upstream; replay disabled")
+        return
+    path = app.config.get('REPLAY_FIXTURES', 'fixtures.mbx')
+    if mode == 'replay' and not os.path.exists(path):
+        print(f"Warning: Fixture file {path} not found; replay disabled")
+        return
+    try:
+        app.extensions['fixtures'] = FixtureStore(path, writable=mode == 'record')
+    except (OSError, ValueError) as e:
+        print(f"Warning: Cannot open fixtures: {e}; replay disabled")
+        return
+    app.register_blueprint(replay_bp)
@@ -1,13 +1,14 @@
 # app/home.py
-from flask import Blueprint, render_template_string
+from flask import Blueprint, Response, current_app, request
 import datetime
-import markdown 
+import hashlib
+import os
+import threading
+from .compression import ENCODERS, compress, negotiate
 
 home_bp = Blueprint('home', __name__)
 
-@home_bp.route('/')
-def home():
-    return render_template_string('''
+HOME_TEMPLATE = '''
     <!DOCTYPE html>
     <html>
     <head>
@@ -81,30 +82,9 @@ def home():
         </div>
     </body>
     </html>
-    ''')
-
-@home_bp.route('/health')
-def health_check():
-    return {
-        'status': 'healthy',
-        'service': 'mock-server',
-        'timestamp': datetime.datetime.utcnow().isoformat(),
-        'version': '1.0'
-    }
+    '''
 
-@home_bp.route('/readme')
-def show_readme():
-    """Display the README.md file as HTML with proper Markdown parsing"""
-    try:
-        with open('README.md', 'r', encoding='utf-8') as f:
-            readme_content = f.read()
-    except FileNotFoundError:
-        return "README.md not found", 404
-    
-    # Convert Markdown to HTML
-    html_content = markdown.markdown(readme_content)
-    
-    return render_template_string('''
+README_TEMPLATE = '''
     <!DOCTYPE html>
     <html>
     <head>
@@ -192,4 +172,92 @@ def show_readme():
         </div>
     </body>
     </html>
-    ''', content=html_content)
\ No newline at end of file
+    '''
+
+class Page:
+    """
+    A rendered HTML page, encoded once per Content-Encoding, with its
+    strong ETag. Served as-is, so requests skip templating and compression.
+    """
+
+    def __init__(self, html):
+        self.bodies = {None: html.encode('utf-8')}
+        self.encodings = tuple(ENCODERS)
+        for encoding in self.encodings:
+            self.bodies[encoding] = compress(self.bodies[None], encoding, best=True)
+        self.etag = hashlib.blake2b(self.bodies[None], digest_size=16).hexdigest()
+
+    def response(self):
+        encoding = negotiate(request.accept_encodings, self.encodings)
+        response = Response(self.bodies[encoding], mimetype='text/html')
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        # One ETag per representation
+        response.set_etag(self.etag if encoding is None else f'{self.etag}-{encoding}')
+        return response.make_conditional(request)
+
+class ReadmePage:
+    """README.md rendered through README_TEMPLATE, re-rendered when the file changes"""
+
+    def __init__(self, template, path='README.md'):
+        self.template = template
+        self.path = path
+        self._page = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """The current Page, or None when the file is missing"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    # markdown is only imported once the readme is requested
+                    import markdown
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        html_content = markdown.markdown(f.read())
+                    self._page = Page(self.template.render(content=html_content))
+                    self._mtime = mtime
+        return self._page
+
+@home_bp.record_once
+def compile_pages(state):
+    """Compile the page templates once, when the blueprint is registered"""
+    app = state.app
+    app.extensions['pages'] = {
+        'home': Page(app.jinja_env.from_string(HOME_TEMPLATE).render()),
+        'readme': ReadmePage(app.jinja_env.from_string(README_TEMPLATE))
+    }
+
+@home_bp.route('/')
+def home():
+    return current_app.extensions['pages']['home'].response()
+
+
+@home_bp.route('/health')
+def health_check():
+    return {
+        'status': 'healthy',
+        'service': 'mock-server',
+        'timestamp': datetime.datetime.utcnow().isoformat(),
+        'version': '1.0',
+        'metrics': current_app.extensions['metrics'].to_dict()
+    }
+
+@home_bp.route('/metrics')
+def metrics():
+    """Per-endpoint request metrics in Prometheus text format"""
+    return Response(current_app.extensions['metrics'].prometheus(),
+                    mimetype='text/plain; version=0.0.4')
+
+@home_bp.route('/readme')
+def show_readme():
+    """Display the README.md file as HTML with proper Markdown parsing"""
+    page = current_app.extensions['pages']['readme'].get()
+    if page is None:
+        return "README.md not found", 404
+    return page.response()
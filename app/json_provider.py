@@ -0,0 +1,92 @@
+# app/json_provider.py
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+import datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+def _default(o):
+    """Serialize dates as ISO 8601 in every provider, then defer to Flask's defaults"""
+    if isinstance(o, (datetime.date, datetime.time)):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's json-module provider, with ISO 8601 dates to match the fast providers"""
+    default = staticmethod(_default)
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson"""
+
+    def _option(self, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self._option(**kwargs)).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self._option(indent=self._app.debug)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=option) + b'\n',
+            mimetype='application/json'
+        )
+
+class MsgspecProvider(JSONProvider):
+    """JSON provider backed by msgspec"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self._encoder = msgspec.json.Encoder(enc_hook=_default, order='sorted')
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj, **kwargs):
+        data = self._encoder.encode(obj)
+        if kwargs.get('indent'):
+            data = msgspec.json.format(data, indent=2)
+        return data.decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return self._decoder.decode(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        data = self._encoder.encode(obj)
+        if self._app.debug:
+            data = msgspec.json.format(data, indent=2)
+        return self._app.response_class(data + b'\n', mimetype='application/json')
+
+PROVIDERS = {
+    'orjson': OrjsonProvider if orjson is not None else None,
+    'msgspec': MsgspecProvider if msgspec is not None else None,
+    'stdlib': StdlibJSONProvider
+}
+
+def available_providers():
+    """Names of the providers whose backing library is installed"""
+    return [name for name, provider in PROVIDERS.items() if provider is not None]
+
+def init_json_provider(app):
+    """Install the provider selected by [server] json_provider (auto, orjson, msgspec or stdlib)"""
+    name = app.config.get('JSON_PROVIDER', 'auto')
+    if name == 'auto':
+        name = available_providers()[0]
+    elif PROVIDERS.get(name) is None:
+        print(f"Warning: JSON provider '{name}' is not available, falling back to stdlib")
+        name = 'stdlib'
+
+    app.json = PROVIDERS[name](app)
+    app.config['JSON_PROVIDER_NAME'] = name
@@ -0,0 +1,212 @@
+# app/latency.py
+from flask import current_app, g, jsonify, request
+import bisect
+import random
+import threading
+import time
+
+# Upper bound for an injected delay, in milliseconds
+MAX_DELAY_MS = 60_000
+
+# Set by the asyncio server once it has already awaited the delay
+DELAY_APPLIED_KEY = 'mock_box.delay_applied'
+
+# Bandwidth limit left for the asyncio server to apply while sending
+BANDWIDTH_KEY = 'mock_box.bandwidth'
+
+# Body bytes sent per throttled write
+THROTTLE_CHUNK_SIZE = 4096
+
+DISTRIBUTIONS = ('fixed', 'normal', 'percentiles')
+
+def requested_delay(args):
+    """Seconds of delay requested with ?delay=<milliseconds>"""
+    try:
+        delay_ms = float(args.get('delay', 0))
+    except (TypeError, ValueError):
+        return 0.0
+    return max(0.0, min(delay_ms, MAX_DELAY_MS)) / 1000
+
+class LatencyProfile:
+    """
+    Simulated network behaviour for a route.
+    distribution: 'fixed' (latency_ms), 'normal' (latency_ms +/- stddev_ms)
+                  or 'percentiles' ({percentile: ms}, interpolated)
+    jitter_ms: uniform noise added on top of the sampled latency
+    bandwidth: body bytes per second once the first byte is sent (0 = unlimited)
+    error_rate: probability of answering with error_status instead
+    """
+
+    def __init__(self, distribution='fixed', latency_ms=0, stddev_ms=0, percentiles=None,
+                 jitter_ms=0, bandwidth=0, error_rate=0, error_status=500):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"distribution must be one of {', '.join(DISTRIBUTIONS)}")
+        if distribution == 'percentiles' and not percentiles:
+            raise ValueError('percentiles distribution requires percentiles')
+        if percentiles is not None and not isinstance(percentiles, dict):
+            raise ValueError('percentiles must map percentiles to milliseconds')
+        if not 0 <= float(error_rate) <= 1:
+            raise ValueError('error_rate must be between 0 and 1')
+        if int(bandwidth) < 0:
+            raise ValueError('bandwidth must be non-negative')
+
+        self.distribution = distribution
+        self.latency_ms = float(latency_ms)
+        self.stddev_ms = float(stddev_ms)
+        self.percentiles = {float(p): float(ms) for p, ms in (percentiles or {}).items()}
+        self.jitter_ms = float(jitter_ms)
+        self.bandwidth = int(bandwidth)
+        self.error_rate = float(error_rate)
+        self.error_status = int(error_status)
+
+        points = sorted(self.percentiles.items())
+        self._quantiles = [p for p, _ in points]
+        self._values = [ms for _, ms in points]
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a profile from config or JSON values"""
+        if not isinstance(data, dict):
+            raise TypeError('expected a JSON object')
+        percentiles = data.get('percentiles')
+        if isinstance(percentiles, str):
+            # "50:20,95:80,99:250" -> {50: 20, 95: 80, 99: 250}
+            percentiles = dict(item.split(':', 1) for item in percentiles.split(',') if item.strip())
+        return cls(
+            distribution=data.get('distribution', 'fixed'),
+            latency_ms=data.get('latency_ms', 0),
+            stddev_ms=data.get('stddev_ms', 0),
+            percentiles=percentiles,
+            jitter_ms=data.get('jitter_ms', 0),
+            bandwidth=data.get('bandwidth', 0),
+            error_rate=data.get('error_rate', 0),
+            error_status=data.get('error_status', 500)
+        )
+
+    def to_dict(self):
+        return {
+            'distribution': self.distribution,
+            'latency_ms': self.latency_ms,
+            'stddev_ms': self.stddev_ms,
+            'percentiles': self.percentiles,
+            'jitter_ms': self.jitter_ms,
+            'bandwidth': self.bandwidth,
+            'error_rate': self.error_rate,
+            'error_status': self.error_status
+        }
+
+    def sample_delay(self):
+        """Seconds to wait before the first byte"""
+        if self.distribution == 'normal':
+            delay_ms = random.gauss(self.latency_ms, self.stddev_ms)
+        elif self.distribution == 'percentiles':
+            delay_ms = self._sample_percentiles(random.random() * 100)
+        else:
+            delay_ms = self.latency_ms
+        if self.jitter_ms:
+            delay_ms += random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, min(delay_ms, MAX_DELAY_MS)) / 1000
+
+    def _sample_percentiles(self, quantile):
+        quantiles, values = self._quantiles, self._values
+        i = bisect.bisect_left(quantiles, quantile)
+        if i == 0:
+            return values[0] * quantile / quantiles[0] if quantiles[0] else values[0]
+        if i == len(quantiles):
+            return values[-1]
+        low_q, high_q = quantiles[i - 1], quantiles[i]
+        low_v, high_v = values[i - 1], values[i]
+        return low_v + (high_v - low_v) * (quantile - low_q) / (high_q - low_q)
+
+    def should_fail(self):
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+class LatencyProfiles:
+    """Latency profiles keyed by route prefix; the longest matching prefix wins"""
+
+    def __init__(self, profiles=None):
+        self._profiles = {}
+        self._prefixes = ()
+        self._lock = threading.Lock()
+        for prefix, profile in (profiles or {}).items():
+            self.set(prefix, profile)
+
+    def __bool__(self):
+        return bool(self._prefixes)
+
+    def set(self, prefix, profile):
+        with self._lock:
+            self._profiles[prefix] = profile
+            self._prefixes = tuple(sorted(self._profiles, key=len, reverse=True))
+
+    def remove(self, prefix):
+        with self._lock:
+            removed = self._profiles.pop(prefix, None)
+            self._prefixes = tuple(sorted(self._profiles, key=len, reverse=True))
+        return removed is not None
+
+    def match(self, path):
+        for prefix in self._prefixes:
+            if path.startswith(prefix):
+                return self._profiles.get(prefix)
+        return None
+
+    def to_dict(self):
+        return {prefix: profile.to_dict() for prefix, profile in self._profiles.items()}
+
+def plan_latency(profiles, path, args):
+    """Return (delay in seconds, matching profile) for a request"""
+    delay = requested_delay(args) if 'delay' in args else 0.0
+    profile = profiles.match(path) if profiles else None
+    if profile is not None:
+        delay += profile.sample_delay()
+    return delay, profile
+
+def throttle(chunks, bandwidth):
+    """Re-chunk a response body and pace it at `bandwidth` bytes per second"""
+    for chunk in chunks:
+        for start in range(0, len(chunk), THROTTLE_CHUNK_SIZE):
+            piece = chunk[start:start + THROTTLE_CHUNK_SIZE]
+            time.sleep(len(piece) / bandwidth)
+            yield piece
+
+def apply_latency():
+    """before_request hook: delay, or fail, the request as its profile says"""
+    profiles = current_app.extensions['latency_profiles']
+    if not profiles and 'delay' not in request.args:
+        return
+
+    if request.environ.get(DELAY_APPLIED_KEY):
+        profile = profiles.match(request.path) if profiles else None
+    else:
+        delay, profile = plan_latency(profiles, request.path, request.args)
+        if delay:
+            time.sleep(delay)
+
+    if profile is None:
+        return
+    g.latency_profile = profile
+    if profile.should_fail():
+        return jsonify({'error': 'Simulated error', 'path': request.path}), profile.error_status
+
+def apply_bandwidth(response):
+    """after_request hook: trickle the body at the profile's bandwidth"""
+    profile = g.get('latency_profile')
+    if profile is None or not profile.bandwidth:
+        return response
+    if request.environ.get(DELAY_APPLIED_KEY):
+        # The asyncio server paces the body without blocking the loop
+        request.environ[BANDWIDTH_KEY] = profile.bandwidth
+    else:
+        response.response = throttle(response.iter_encoded(), profile.bandwidth)
+    return response
+
+def init_latency(app):
+    """Install latency profiles from config and the hooks that apply them"""
+    profiles = {
+        prefix: LatencyProfile.from_dict(settings)
+        for prefix, settings in app.config.get('LATENCY_PROFILES', {}).items()
+    }
+    app.extensions['latency_profiles'] = LatencyProfiles(profiles)
+    app.before_request(apply_latency)
+    app.after_request(apply_bandwidth)
@@ -0,0 +1,240 @@
+# app/metrics.py
+from flask import g, request
+from collections import deque
+import threading
+import time
+
+# Log-linear (HDR-style) buckets: 2**SUB_BITS linear sub-buckets per power of
+# two, i.e. ~6% relative precision, over microsecond values up to 2**MAX_BITS
+SUB_BITS = 4
+SUB_COUNT = 1 << SUB_BITS
+MAX_BITS = 36
+BUCKET_COUNT = (MAX_BITS - SUB_BITS + 1) * SUB_COUNT
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+# Seconds between folds of the per-thread sample buffers
+FOLD_INTERVAL = 1.0
+
+# A thread folds its own buffer past this many samples
+MAX_BUFFERED = 65536
+
+def bucket_index(value):
+    """Histogram bucket of a non-negative integer value"""
+    if value < SUB_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BITS - 1
+    index = (shift + 1) * SUB_COUNT + (value >> shift) - SUB_COUNT
+    return index if index < BUCKET_COUNT else BUCKET_COUNT - 1
+
+def bucket_value(index):
+    """Midpoint of the values falling into a bucket"""
+    if index < SUB_COUNT:
+        return index
+    shift = index // SUB_COUNT - 1
+    low = (SUB_COUNT + index % SUB_COUNT) << shift
+    return low + ((1 << shift) - 1) / 2
+
+class Histogram:
+    """Fixed-size log-linear histogram of microsecond values"""
+    __slots__ = ('count', 'total', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.buckets = [0] * BUCKET_COUNT
+
+    def record(self, value):
+        self.count += 1
+        self.total += value
+        self.buckets[bucket_index(value)] += 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return bucket_value(index)
+        return bucket_value(BUCKET_COUNT - 1)
+
+class EndpointStats:
+    """Everything recorded for one (endpoint, auth type) pair"""
+    __slots__ = ('latency', 'auth', 'response_bytes', 'statuses')
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.auth = Histogram()
+        self.response_bytes = 0
+        self.statuses = {}
+
+    def merge(self, other):
+        self.latency.merge(other.latency)
+        self.auth.merge(other.auth)
+        self.response_bytes += other.response_bytes
+        for status, n in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + n
+
+class Metrics:
+    """
+    Per-endpoint request metrics.
+    Recording only appends a tuple to a per-thread buffer, so it takes no
+    lock; a background thread (or any reader) folds the buffers into the
+    shared histograms.
+    """
+
+    def __init__(self, fold_interval=FOLD_INTERVAL):
+        self.fold_interval = fold_interval
+        self._local = threading.local()
+        self._buffers = []
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._folder = None
+
+    def _buffer(self):
+        buffer = self._local.buffer = deque()
+        with self._lock:
+            self._buffers.append((threading.current_thread(), buffer))
+            if self._folder is None:
+                self._folder = threading.Thread(target=self._fold_forever, name='mock-box-metrics', daemon=True)
+                self._folder.start()
+        return buffer
+
+    def record(self, endpoint, auth_type, status, latency_us, size, auth_us=None):
+        try:
+            buffer = self._local.buffer
+        except AttributeError:
+            buffer = self._buffer()
+        buffer.append((endpoint, auth_type, status, latency_us, size, auth_us))
+        if len(buffer) > MAX_BUFFERED:
+            self.fold()
+
+    def _fold_forever(self):
+        while True:
+            time.sleep(self.fold_interval)
+            self.fold()
+
+    def fold(self):
+        """Move buffered samples into the histograms"""
+        with self._lock:
+            stats_map = self._stats
+            live = []
+            for thread, buffer in self._buffers:
+                # A thread found dead here appends nothing more, so once its
+                # buffer is drained it can be dropped
+                if thread.is_alive():
+                    live.append((thread, buffer))
+                # popleft() is atomic, so writers may keep appending meanwhile
+                for _ in range(len(buffer)):
+                    endpoint, auth_type, status, latency_us, size, auth_us = buffer.popleft()
+                    key = (endpoint, auth_type)
+                    stats = stats_map.get(key)
+                    if stats is None:
+                        stats = stats_map[key] = EndpointStats()
+                    stats.latency.record(latency_us)
+                    if auth_us is not None:
+                        stats.auth.record(auth_us)
+                    stats.response_bytes += size
+                    stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            self._buffers = live
+
+    def snapshot(self):
+        """Copy of the stats, keyed by (endpoint, auth type)"""
+        self.fold()
+        with self._lock:
+            snapshot = {}
+            for key, stats in self._stats.items():
+                snapshot[key] = copy = EndpointStats()
+                copy.merge(stats)
+            return snapshot
+
+    def to_dict(self):
+        """JSON summary for /health"""
+        endpoints = []
+        for (endpoint, auth_type), stats in sorted(self.snapshot().items(), key=lambda item: str(item[0])):
+            latency = stats.latency
+            entry = {
+                'endpoint': endpoint,
+                'auth_type': auth_type,
+                'requests': latency.count,
+                'statuses': {str(status): n for status, n in sorted(stats.statuses.items())},
+                'response_bytes': stats.response_bytes,
+                'latency_ms': _quantiles_ms(latency)
+            }
+            if stats.auth.count:
+                entry['auth_decode_ms'] = _quantiles_ms(stats.auth)
+            endpoints.append(entry)
+        return {'endpoints': endpoints}
+
+    def prometheus(self):
+        """Prometheus text exposition format"""
+        lines = [
+            '# HELP mockbox_requests_total Requests handled, by endpoint, auth type and status.',
+            '# TYPE mockbox_requests_total counter'
+        ]
+        snapshot = sorted(self.snapshot().items(), key=lambda item: str(item[0]))
+        for (endpoint, auth_type), stats in snapshot:
+            for status, n in sorted(stats.statuses.items()):
+                lines.append(f'mockbox_requests_total{{{_labels(endpoint, auth_type)},status="{status}"}} {n}')
+
+        lines += [
+            '# HELP mockbox_response_bytes_total Response body bytes sent.',
+            '# TYPE mockbox_response_bytes_total counter'
+        ]
+        for (endpoint, auth_type), stats in snapshot:
+            lines.append(f'mockbox_response_bytes_total{{{_labels(endpoint, auth_type)}}} {stats.response_bytes}')
+
+        for name, attribute, help_text in (
+            ('mockbox_request_duration_seconds', 'latency', 'Time spent handling requests.'),
+            ('mockbox_auth_decode_seconds', 'auth', 'Time spent verifying credentials.')
+        ):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} summary']
+            for (endpoint, auth_type), stats in snapshot:
+                histogram = getattr(stats, attribute)
+                if not histogram.count:
+                    continue
+                labels = _labels(endpoint, auth_type)
+                for q in QUANTILES:
+                    lines.append(f'{name}{{{labels},quantile="{q}"}} {histogram.quantile(q) / 1e6:.6f}')
+                lines.append(f'{name}_sum{{{labels}}} {histogram.total / 1e6:.6f}')
+                lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+def _quantiles_ms(histogram):
+    summary = {f'p{int(q * 100)}': round(histogram.quantile(q) / 1000, 3) for q in QUANTILES}
+    summary['mean'] = round(histogram.total / histogram.count / 1000, 3) if histogram.count else 0.0
+    return summary
+
+def _labels(endpoint, auth_type):
+    return f'endpoint="{endpoint}",auth_type="{auth_type or "none"}"'
+
+def init_metrics(app):
+    """Install the metrics registry and the hooks that time each request"""
+    metrics = app.extensions['metrics'] = Metrics()
+    perf_counter = time.perf_counter
+
+    @app.before_request
+    def start_timer():
+        g.request_start = perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.get('request_start')
+        if start is not None:
+            auth_time = g.get('auth_decode_time')
+            metrics.record(
+                request.endpoint or 'unmatched',
+                g.get('auth_type'),
+                response.status_code,
+                int((perf_counter() - start) * 1e6),
+                response.content_length or 0,
+                None if auth_time is None else int(auth_time * 1e6)
+            )
+        return response
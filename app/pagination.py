@@ -0,0 +1,111 @@
+# app/pagination.py
+from flask import request, current_app
+from urllib.parse import urlencode
+import base64
+import json
+from .dataset import current_seed
+from .streaming import collection_response
+
+DEFAULT_MAX_LIMIT = 1_000_000
+
+class PaginationError(ValueError):
+    """Raised for malformed limit/offset/cursor parameters"""
+
+def encode_cursor(offset, seed):
+    """Encode a position in a listing as an opaque cursor"""
+    raw = json.dumps({'o': offset, 's': seed}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+def decode_cursor(cursor):
+    """Decode a cursor into (offset, seed)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+        offset, seed = int(data['o']), data['s']
+    except (ValueError, TypeError, KeyError):
+        raise PaginationError('Invalid cursor')
+    if offset < 0 or not (seed is None or isinstance(seed, int)):
+        raise PaginationError('Invalid cursor')
+    return offset, seed
+
+class Page:
+    """A window [offset, offset + limit) over a listing of `total` rows"""
+
+    def __init__(self, offset, limit, total, seed=None):
+        self.offset = min(offset, total)
+        self.limit = limit
+        self.total = total
+        self.seed = seed
+
+    @property
+    def stop(self):
+        return min(self.offset + self.limit, self.total)
+
+    def headers(self):
+        """Pagination metadata; response bodies keep their original shape"""
+        headers = {'X-Total-Count': str(self.total)}
+        links = []
+        if self.stop < self.total:
+            cursor = encode_cursor(self.stop, self.seed)
+            headers['X-Next-Cursor'] = cursor
+            links.append(f'<{_page_url(cursor)}>; rel="next"')
+        if self.offset > 0:
+            previous = encode_cursor(max(self.offset - self.limit, 0), self.seed)
+            links.append(f'<{_page_url(previous)}>; rel="prev"')
+        if links:
+            headers['Link'] = ', '.join(links)
+        return headers
+
+def _page_url(cursor):
+    args = [(key, value) for key, value in request.args.items(multi=True) if key not in ('cursor', 'offset')]
+    args.append(('cursor', cursor))
+    return f'{request.base_url}?{urlencode(args)}'
+
+def int_arg(name, default):
+    """Integer query parameter; malformed values are a PaginationError, not the default"""
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise PaginationError(f'{name} must be an integer')
+
+def page_seed():
+    """Seed of the requested page: the cursor's, else the request's"""
+    cursor = request.args.get('cursor')
+    return decode_cursor(cursor)[1] if cursor else current_seed()
+
+def current_page(total, default_limit, max_limit=None, seed=None):
+    """
+    Build the Page requested through ?limit=, ?offset= and ?cursor=.
+    `seed` replaces the request's seed when no cursor is given.
+    """
+    if max_limit is None:
+        max_limit = current_app.config.get('MAX_PAGE_LIMIT', DEFAULT_MAX_LIMIT)
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        offset, seed = decode_cursor(cursor)
+    else:
+        offset, seed = int_arg('offset', 0), current_seed() if seed is None else seed
+    limit = int_arg('limit', default_limit)
+
+    if offset < 0 or limit < 0:
+        raise PaginationError('limit and offset must be non-negative')
+    return Page(offset, min(limit, max_limit), total, seed)
+
+def resource_total(resource):
+    """Virtual row count of a resource, overridable in the [resources] config section"""
+    return current_app.config.get('RESOURCE_TOTALS', {}).get(resource.name, resource.total)
+
+def paginated_response(resource, envelope=None):
+    """Respond with one page of a dataset Resource, generating only that page's rows"""
+    page = current_page(resource_total(resource), resource.total)
+    rows = resource.iter_rows(page.seed, page.offset, page.stop)
+    return collection_response(rows, envelope, headers=page.headers())
+
+def paginated_list(items, envelope=None):
+    """Respond with one page of an in-memory list"""
+    page = current_page(len(items), len(items))
+    return collection_response(items[page.offset:page.stop], envelope, headers=page.headers())
@@ -0,0 +1,74 @@
+# app/persistence.py
+from configparser import ConfigParser
+import atexit
+import os
+import tempfile
+import threading
+import time
+
+class AdminKeyWriter:
+    """
+    Write-behind persistence of admin API keys to config.ini.
+    Changes are coalesced: only the latest key set is kept, written by a
+    background thread after a short batching delay, atomically (temp file
+    plus rename), and flushed on interpreter shutdown.
+    """
+
+    def __init__(self, path='config.ini', delay=0.5):
+        self.path = path
+        self.delay = delay
+        self._pending = None
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+        atexit.register(self.flush)
+
+    def schedule(self, keys):
+        """Queue `keys` to be written; supersedes any not yet written"""
+        with self._cond:
+            self._pending = list(keys)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='admin-key-writer', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def flush(self):
+        """Write any pending keys now"""
+        # Taking the keys under the write lock keeps concurrent flushes in
+        # order, so an older key set is never written after a newer one
+        with self._write_lock:
+            with self._cond:
+                keys, self._pending = self._pending, None
+            if keys is not None:
+                self._write(keys)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+            # Let a burst of mutations collapse into a single write
+            time.sleep(self.delay)
+            self.flush()
+
+    def _write(self, keys):
+        try:
+            config = ConfigParser()
+            config.read(self.path)
+            if not config.has_section('auth'):
+                config.add_section('auth')
+            config.set('auth', 'admin_api_keys', ','.join(keys))
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, temp_path = tempfile.mkstemp(prefix='.config-', suffix='.tmp', dir=directory)
+            try:
+                with os.fdopen(fd, 'w') as configfile:
+                    config.write(configfile)
+                if os.path.exists(self.path):
+                    os.chmod(temp_path, os.stat(self.path).st_mode & 0o777)
+                os.replace(temp_path, self.path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except Exception as e:
+            print(f"Error saving admin keys: {e}")
@@ -0,0 +1,341 @@
+# app/relational.py
+from flask import current_app, request
+from collections import OrderedDict
+from datetime import datetime, timezone
+import bisect
+import logging
+import os
+import random
+import threading
+from .columnar import NO_MATCH, DateTimeColumn, DictionaryColumn, IntColumn, argsort, column_for, positions_array
+from .pagination import current_page, page_seed, resource_total
+from .snapshot import SnapshotError, fingerprint, load_snapshot, snapshot_path, write_snapshot
+from .streaming import collection_response
+
+# Query parameters bounding a schema's sorted index
+RANGE_PARAMS = ('since', 'until')
+
+# Query parameters every schema route accepts besides its filters
+LISTING_PARAMS = frozenset(('seed', 'limit', 'offset', 'cursor', 'stream', 'delay'))
+
+class QueryError(ValueError):
+    """Raised for malformed or unsupported filters"""
+
+def index_key(value):
+    """Key of a field value in a hash index; query strings are matched against it"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+def parse_time(value):
+    """Parse a ?since=/?until= ISO 8601 timestamp into a naive UTC datetime"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise QueryError(f'Invalid timestamp: {value}')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+class Table:
+    """
+    The materialized rows of one resource for one seed, held column by
+    column, with a hash index per filterable field and an optional sorted
+    index for range queries. Rows become dicts only when served.
+    """
+
+    def __init__(self, columns, hash_fields=(), sorted_field=None, hash_indexes=None, sorted_positions=None):
+        self.columns = columns
+        self._items = tuple(columns.items())
+        # Indexes not passed in (e.g. loaded from a snapshot) are built here
+        hash_indexes = hash_indexes or {}
+        self.hash_indexes = {
+            field: hash_indexes[field] if field in hash_indexes else _hash_index(columns[field])
+            for field in hash_fields
+        }
+        self.sorted_field = sorted_field
+        self.sorted_positions, self.sorted_keys = positions_array(), []
+        if sorted_field:
+            column = columns[sorted_field]
+            self.sorted_positions = argsort(column) if sorted_positions is None else sorted_positions
+            data = column.data if isinstance(column, DateTimeColumn) else column
+            self.sorted_keys = _SortedKeys(data, self.sorted_positions)
+
+    @classmethod
+    def from_rows(cls, rows, fields, hash_fields=(), sorted_field=None):
+        """Build a table from row dicts, appending each field to its column"""
+        columns = {field: column_for(spec) for field, spec in fields.items()}
+        appends = [(field, columns[field].append) for field in fields]
+        dictionaries = [field for field, column in columns.items() if isinstance(column, DictionaryColumn)]
+        for row in rows:
+            for field, append in appends:
+                append(row[field])
+            for field in dictionaries:
+                if columns[field].spills():
+                    columns[field] = columns[field].to_strings()
+                    appends = [(name, columns[name].append) for name in fields]
+                    dictionaries.remove(field)
+                    break
+        for column in columns.values():
+            if isinstance(column, IntColumn):
+                column.compact()
+        return cls(columns, hash_fields, sorted_field)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def row(self, position):
+        return {field: column[position] for field, column in self._items}
+
+    def _bounds(self, since, until):
+        """since/until in the sorted column's key space"""
+        column = self.columns[self.sorted_field]
+        if isinstance(column, DateTimeColumn):
+            since = None if since is None else column.encode(since)
+            until = None if until is None else column.encode(until)
+        return since, until
+
+    def select(self, equals, since=None, until=None):
+        """
+        Ascending positions of the rows matching every filter. The most
+        selective index produces the candidates; the other filters are then
+        checked against those rows only.
+        """
+        candidates = []
+        values = {}
+        for field, text in equals.items():
+            value = values[field] = self.columns[field].parse(text)
+            positions = () if value is NO_MATCH else self.hash_indexes[field].get(value, ())
+            candidates.append((len(positions), positions, field))
+        ranged = since is not None or until is not None
+        if ranged:
+            since, until = self._bounds(since, until)
+            low = 0 if since is None else bisect.bisect_left(self.sorted_keys, since)
+            high = len(self.sorted_keys) if until is None else bisect.bisect_right(self.sorted_keys, until)
+            candidates.append((max(high - low, 0), (low, max(high, low)), None))
+        if not candidates:
+            return range(len(self))
+
+        _, driver, driver_field = min(candidates, key=lambda candidate: candidate[0])
+        if driver_field is None:
+            low, high = driver
+            driver = sorted(self.sorted_positions[low:high])
+            ranged = False
+
+        checks = [(self.columns[field], value) for field, value in values.items() if field != driver_field]
+        if not checks and not ranged:
+            return driver
+        sort_key = self.sorted_keys.key if ranged else None
+        selected = []
+        for position in driver:
+            if any(column[position] != value for column, value in checks):
+                continue
+            if ranged:
+                key = sort_key(position)
+                if (since is not None and key < since) or (until is not None and key > until):
+                    continue
+            selected.append(position)
+        return selected
+
+class _SortedKeys:
+    """Sequence view of a column in sorted order, for bisect"""
+
+    def __init__(self, data, positions):
+        self.data = data
+        self.positions = positions
+        # Sort key of the row at a position
+        self.key = data.__getitem__
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        return self.data[self.positions[index]]
+
+def _hash_index(column):
+    """Map each value of a column to the ascending positions holding it"""
+    if isinstance(column, DictionaryColumn):
+        buckets = [positions_array() for _ in column.values]
+        for position, code in enumerate(column.codes):
+            buckets[code].append(position)
+        return dict(zip(column.values, buckets))
+    index = {}
+    for position in range(len(column)):
+        value = column[position]
+        bucket = index.get(value)
+        if bucket is None:
+            bucket = index[value] = positions_array()
+        bucket.append(position)
+    return index
+
+class RelationalStore:
+    """
+    Materialized tables keyed by (resource, seed, total), built lazily on the
+    first filtered query and kept in a small LRU. Because foreign keys are
+    generated within the referenced resource's total, the tables of one seed
+    are consistent with each other.
+
+    With a `snapshot_dir`, each table is written to a binary snapshot once
+    and memory-mapped from it afterwards, including by other workers and
+    after a restart.
+    """
+
+    def __init__(self, max_tables=16, max_rows=5_000_000, snapshot_dir='', totals=None, logger=None):
+        self.max_tables = max_tables
+        self.max_rows = max_rows
+        self.snapshot_dir = snapshot_dir
+        self.totals = totals or {}
+        self.logger = logger or logging.getLogger(__name__)
+        self._tables = OrderedDict()
+        self._building = {}
+        self._unseeded = {}
+        self._lock = threading.Lock()
+
+    def table(self, schema, seed, total):
+        key = (schema.resource.name, seed, total)
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+                return table
+            build_lock = self._building.setdefault(key, threading.Lock())
+
+        # Concurrent requests for the same table wait for one build
+        with build_lock:
+            with self._lock:
+                table = self._tables.get(key)
+            if table is None:
+                table = self._materialize(schema, seed, total)
+                with self._lock:
+                    self._tables[key] = table
+                    while len(self._tables) > self.max_tables:
+                        self._tables.popitem(last=False)
+                    self._building.pop(key, None)
+        return table
+
+    def unseeded_seed(self, name):
+        """
+        Random seed serving a resource's unseeded filters. One per resource
+        and process, so its table is built once rather than per request.
+        """
+        with self._lock:
+            seed = self._unseeded.get(name)
+            if seed is None:
+                seed = self._unseeded[name] = random.getrandbits(31)
+            return seed
+
+    def _materialize(self, schema, seed, total):
+        if not self.snapshot_dir:
+            return self._build(schema, seed, total)
+        name = schema.resource.name
+        meta = {
+            'resource': name,
+            'seed': seed,
+            'total': total,
+            'fingerprint': fingerprint(schema, self.totals),
+            'hash_fields': list(schema.hash_indexes)
+        }
+        path = snapshot_path(self.snapshot_dir, name, seed, total, meta['fingerprint'])
+        if os.path.exists(path):
+            try:
+                return load_snapshot(path, Table, meta)
+            except SnapshotError as e:
+                self.logger.warning('%s; regenerating it', e)
+        table = self._build(schema, seed, total)
+        try:
+            write_snapshot(path, table, meta)
+            # Serve from the mapping so the heap copy can be released
+            return load_snapshot(path, Table, meta)
+        except (OSError, SnapshotError) as e:
+            self.logger.warning('Could not snapshot %s: %s', name, e)
+            return table
+
+    @staticmethod
+    def _build(schema, seed, total):
+        rows = schema.resource.iter_rows(seed, 0, total)
+        return Table.from_rows(rows, schema.fields, schema.hash_indexes, schema.sorted_index)
+
+    def preload(self, schemas, names, seed):
+        """Materialize (or map) the tables of `names` for a seed ahead of the first query"""
+        for name in names:
+            schema = schemas.get(name)
+            if schema is None:
+                self.logger.warning("Cannot preload unknown resource '%s'", name)
+                continue
+            total = self.totals.get(name, schema.resource.total)
+            if total > self.max_rows:
+                self.logger.warning('Not preloading %s: %d rows exceeds max_materialized_rows', name, total)
+                continue
+            self.table(schema, seed, total)
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+
+def init_relational_store(app):
+    app.extensions['relational_store'] = RelationalStore(
+        max_tables=app.config.get('MATERIALIZED_TABLES', 16),
+        max_rows=app.config.get('MAX_MATERIALIZED_ROWS', 5_000_000),
+        snapshot_dir=app.config.get('SNAPSHOT_DIR', ''),
+        totals=app.config.get('RESOURCE_TOTALS', {}),
+        logger=app.logger
+    )
+
+def preload_tables(app, schemas):
+    """Load the [data] preload resources for the configured seed at startup"""
+    names = app.config.get('SNAPSHOT_PRELOAD', [])
+    if not names:
+        return
+    if app.config.get('DATA_SEED') is None:
+        app.logger.warning('[data] preload needs a seed; skipping')
+        return
+    app.extensions['relational_store'].preload(schemas, names, app.config['DATA_SEED'])
+
+def is_filtered(schema, args):
+    return any(field in args for field in schema.hash_indexes) or any(param in args for param in RANGE_PARAMS)
+
+def check_params(schema, args):
+    """Reject query parameters a schema route would otherwise silently ignore"""
+    for name in args:
+        if name in LISTING_PARAMS or name in RANGE_PARAMS or name in schema.hash_indexes:
+            continue
+        if name in schema.fields:
+            raise QueryError(f'{schema.resource.name} cannot be filtered by {name}')
+        raise QueryError(f'Unknown query parameter: {name}')
+
+def query_filters(schema, args):
+    """Return (equality filters, since, until) requested for a schema"""
+    equals = {field: args[field] for field in schema.hash_indexes if field in args}
+    since = until = None
+    if 'since' in args or 'until' in args:
+        if not schema.sorted_index:
+            raise QueryError(f'{schema.resource.name} cannot be filtered by time')
+        since = parse_time(args['since']) if 'since' in args else None
+        until = parse_time(args['until']) if 'until' in args else None
+    return equals, since, until
+
+def filtered_response(schema):
+    """
+    Respond with one page of the rows matching the request's filters.
+    Answered from the indexes of the table materialized for the request's
+    seed. Unseeded requests are given a random seed, returned in X-Seed and
+    in the cursors, so their pages stay consistent.
+    """
+    equals, since, until = query_filters(schema, request.args)
+    resource = schema.resource
+    total = resource_total(resource)
+    store = current_app.extensions['relational_store']
+    if total > store.max_rows:
+        raise QueryError(f'Filtering is limited to resources of at most {store.max_rows} rows')
+
+    seed = page_seed()
+    headers = {}
+    if seed is None:
+        seed = store.unseeded_seed(resource.name)
+        headers['X-Seed'] = str(seed)
+    table = store.table(schema, seed, total)
+    positions = table.select(equals, since, until)
+    page = current_page(len(positions), resource.total, seed=seed)
+    page_rows = [table.row(position) for position in positions[page.offset:page.stop]]
+    headers.update(page.headers())
+    return collection_response(page_rows, schema.envelope, headers=headers)
@@ -1,6 +1,9 @@
 # app/routes/admin.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from ..auth import auth_manager, require_auth
+from ..streaming import ROWS
+from ..pagination import paginated_list
+from ..latency import LatencyProfile
 import secrets
 
 admin_bp = Blueprint('admin', __name__)
@@ -10,19 +13,26 @@ admin_bp = Blueprint('admin', __name__)
 @require_auth('any')
 def get_admin_api_keys():
     """Get all admin-configured API keys"""
-    return jsonify({
-        'admin_api_keys': auth_manager.get_admin_api_keys(),
-        'total': len(auth_manager.get_admin_api_keys())
+    admin_api_keys = auth_manager.get_admin_api_keys()
+    return paginated_list(admin_api_keys, envelope={
+        'admin_api_keys': ROWS,
+        'total': len(admin_api_keys)
     })
 
 @admin_bp.route('/admin/api-keys', methods=['POST'])
 @require_auth('any')
 def create_admin_api_key():
     """Create a new admin API key"""
-    data = request.get_json() or {}
+    data = request.get_json()
+    if data is None:
+        data = {}
+    elif not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
     
     if 'api_key' in data:
         api_key = data['api_key']
+        if not isinstance(api_key, str):
+            return jsonify({'error': 'api_key must be a string'}), 400
     else:
         api_key = f"admin_{secrets.token_hex(16)}"
     
@@ -52,9 +62,10 @@ def delete_admin_api_key(api_key):
 @require_auth('any')
 def get_generated_tokens():
     """Get all dynamically generated tokens"""
-    return jsonify({
-        'generated_tokens': list(auth_manager.tokens),
-        'total': len(auth_manager.tokens)
+    generated_tokens = list(auth_manager.tokens)
+    return paginated_list(generated_tokens, envelope={
+        'generated_tokens': ROWS,
+        'total': len(generated_tokens)
     })
 
 @admin_bp.route('/admin/clear-tokens', methods=['POST'])
@@ -66,4 +77,41 @@ def clear_generated_tokens():
     return jsonify({
         'message': f'Cleared {count} generated tokens',
         'cleared_count': count
+    })
+
+@admin_bp.route('/admin/latency', methods=['GET'])
+@require_auth('any')
+def get_latency_profiles():
+    """Get all latency profiles by route prefix"""
+    profiles = current_app.extensions['latency_profiles']
+    return jsonify({'latency_profiles': profiles.to_dict()})
+
+@admin_bp.route('/admin/latency/<path:route>', methods=['PUT'])
+@require_auth('any')
+def set_latency_profile(route):
+    """Create or replace the latency profile for a route prefix"""
+    data = request.get_json()
+    try:
+        profile = LatencyProfile.from_dict(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid latency profile: {e}'}), 400
+    
+    prefix = '/' + route
+    current_app.extensions['latency_profiles'].set(prefix, profile)
+    return jsonify({
+        'message': 'Latency profile saved',
+        'route': prefix,
+        'profile': profile.to_dict()
+    })
+
+@admin_bp.route('/admin/latency/<path:route>', methods=['DELETE'])
+@require_auth('any')
+def delete_latency_profile(route):
+    """Remove the latency profile for a route prefix"""
+    prefix = '/' + route
+    if not current_app.extensions['latency_profiles'].remove(prefix):
+        return jsonify({'error': 'No latency profile for this route'}), 404
+    return jsonify({
+        'message': 'Latency profile deleted',
+        'route': prefix
     })
\ No newline at end of file
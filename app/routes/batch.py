@@ -0,0 +1,120 @@
+# app/routes/batch.py
+from flask import Blueprint, Response, current_app, g, jsonify, request, stream_with_context
+import json
+from ..auth import require_auth
+from ..streaming import NDJSON_MIMETYPE, stream_mode
+
+batch_bp = Blueprint('batch', __name__)
+
+# Most sub-requests accepted in one batch
+MAX_BATCH_SIZE = 100
+
+# Sub-response headers included in each result
+RESULT_HEADERS = ('Content-Type', 'X-Total-Count', 'X-Next-Cursor', 'Link')
+
+# Sub-request headers replaced by the batch request's own: sub-requests are
+# authorized as the batch was, and their bodies are spliced in uncompressed
+BATCH_HEADERS = frozenset(('authorization', 'accept-encoding'))
+
+class BatchError(ValueError):
+    """Raised for a malformed batch body"""
+
+def parse_batch(body):
+    """Validate a batch body: a list of sub-requests, or {"requests": [...]}"""
+    items = body.get('requests') if isinstance(body, dict) else body
+    if not isinstance(items, list) or not items:
+        raise BatchError('Expected a non-empty list of requests')
+    if len(items) > MAX_BATCH_SIZE:
+        raise BatchError(f'At most {MAX_BATCH_SIZE} requests per batch')
+    parsed = []
+    for position, item in enumerate(items):
+        if isinstance(item, str):
+            item = {'path': item}
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str) or not item['path'].startswith('/'):
+            raise BatchError(f'Request {position} needs an absolute "path"')
+        path, _, query_string = item['path'].partition('?')
+        if path.rstrip('/') == request.path.rstrip('/'):
+            raise BatchError(f'Request {position}: batches cannot be nested')
+        parsed.append({
+            'id': item.get('id', position),
+            'method': str(item.get('method', 'GET')).upper(),
+            'path': path,
+            'query': item.get('query') or query_string,
+            'headers': item.get('headers') or {},
+            'body': item.get('body')
+        })
+    return parsed
+
+def dispatch(item, authorization):
+    """
+    Run one sub-request through its view function in a request context of
+    its own, skipping the request hooks (latency, replay, metrics, logging).
+    Returns (status, headers, body bytes).
+    """
+    app = current_app._get_current_object()
+    headers = {name: value for name, value in item['headers'].items() if name.lower() not in BATCH_HEADERS}
+    if authorization:
+        headers['Authorization'] = authorization
+    context = app.test_request_context(
+        item['path'], base_url=request.host_url, method=item['method'], query_string=item['query'],
+        headers=headers, json=item['body']
+    )
+    # Shares the batch request's app context, and so g.batch_auth
+    with context:
+        try:
+            try:
+                rv = app.dispatch_request()
+            except Exception as e:
+                rv = app.handle_user_exception(e)
+            response = app.make_response(rv)
+            body = response.get_data()
+        except Exception as e:
+            print(f"Warning: Batch request {item['path']} failed: {e}")
+            return 500, {'Content-Type': 'application/json'}, b'{"error": "Internal server error"}'
+    result_headers = {name: response.headers[name] for name in RESULT_HEADERS if name in response.headers}
+    return response.status_code, result_headers, body
+
+def result_json(item, status, headers, body, compact=False):
+    """One result as JSON text. JSON bodies are spliced in as they are, not re-parsed"""
+    dumps = current_app.json.dumps
+    if headers.get('Content-Type', '').startswith('application/json') and body.strip():
+        text = body.decode('utf-8')
+        if compact:
+            text = dumps(json.loads(text))
+    else:
+        text = dumps(body.decode('utf-8', 'replace'))
+    return '{"id": %s, "status": %d, "headers": %s, "body": %s}' % (dumps(item['id']), status, dumps(headers), text)
+
+@batch_bp.route('/batch', methods=['POST'])
+@require_auth('any')
+def batch():
+    """
+    Run several sub-requests in one round trip, authenticated once.
+    Accept: application/x-ndjson streams one result per line as each completes;
+    ?stream=1 streams the combined JSON document.
+    """
+    try:
+        items = parse_batch(request.get_json(silent=True))
+    except BatchError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Checked by require_auth in every sub-request
+    g.batch_auth = (g.auth_type, getattr(request, 'user', None))
+    authorization = request.headers.get('Authorization')
+    mode = stream_mode()
+
+    if mode == 'ndjson':
+        def generate_lines():
+            for item in items:
+                yield result_json(item, *dispatch(item, authorization), compact=True) + '\n'
+        return Response(stream_with_context(generate_lines()), mimetype=NDJSON_MIMETYPE)
+
+    def generate():
+        yield '{"responses": ['
+        for position, item in enumerate(items):
+            yield (',' if position else '') + result_json(item, *dispatch(item, authorization))
+        yield ']}'
+
+    if mode == 'json':
+        return Response(stream_with_context(generate()), mimetype='application/json')
+    return Response(''.join(generate()), mimetype='application/json')
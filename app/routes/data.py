@@ -1,15 +1,21 @@
 # app/routes/data.py
 from flask import Blueprint, jsonify, request
-from ..utils import generate_mock_phone_numbers
+from ..utils import generate_mock_names
+from ..streaming import collection_response
+from ..cache import cached_response
+from ..pagination import paginated_list
+from .phone_numbers import phone_numbers_page
 
 data_bp = Blueprint('data', __name__)
 
 @data_bp.route('/data', methods=['GET'])
+@cached_response(seeded=True)
 def get_data():
     data_type = request.args.get('type', 'default')
     if data_type == 'numbers':
-        return jsonify(generate_mock_phone_numbers())
+        phone_numbers, headers = phone_numbers_page()
+        return collection_response(phone_numbers, headers=headers)
     elif data_type == 'names':
-        return jsonify(generate_mock_names())
+        return paginated_list(generate_mock_names())
     else:
         return jsonify({"message": "Unknown data type"}), 400
@@ -1,8 +1,10 @@
 # app/routes/errors.py
 from flask import Blueprint, jsonify
+from ..cache import cached_response
 
 errors_bp = Blueprint('errors', __name__)
 
 @errors_bp.route('/error', methods=['GET'])
+@cached_response()
 def error_simulation():
     return jsonify({"error": "Simulated error"}), 500
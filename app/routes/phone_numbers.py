@@ -1,6 +1,9 @@
 # app/routes/phone_numbers.py
-from flask import Blueprint, jsonify, request
-from ..utils import generate_mock_phone_numbers
+from flask import Blueprint, request, current_app, g
+from ..utils import iter_mock_phone_numbers, MAX_PHONE_NUMBERS
+from ..streaming import collection_response, ROWS
+from ..pagination import current_page, int_arg
+from ..cache import cached_response
 from ..auth import require_auth, no_auth_required
 
 phone_numbers_bp = Blueprint('phone-numbers', __name__)
@@ -8,49 +11,61 @@ phone_numbers_bp = Blueprint('phone-numbers', __name__)
 # Public endpoint - no authentication required
 @phone_numbers_bp.route('/phone-numbers/public', methods=['GET'])
 @no_auth_required
+@cached_response(seeded=True)
 def get_phone_numbers_public():
     """Public endpoint - no authentication required"""
-    phone_numbers = generate_mock_phone_numbers()
-    return jsonify({
-        'phone_numbers': phone_numbers,
+    phone_numbers, headers = phone_numbers_page()
+    return collection_response(phone_numbers, envelope={
+        'phone_numbers': ROWS,
         'auth_required': False,
         'message': 'Public access - no authentication required'
-    })
+    }, headers=headers)
 
 # Protected endpoint - requires any authentication
 @phone_numbers_bp.route('/phone-numbers', methods=['GET'])
 @require_auth('any')
 def get_phone_numbers_protected():
     """Protected endpoint - requires authentication"""
-    phone_numbers = generate_mock_phone_numbers()
+    phone_numbers, headers = phone_numbers_page()
     
     auth_context = get_auth_context()
     
-    return jsonify({
-        'phone_numbers': phone_numbers,
+    return collection_response(phone_numbers, envelope={
+        'phone_numbers': ROWS,
         'auth_required': True,
         'auth_context': auth_context
-    })
+    }, headers=headers)
 
 # Specific auth type endpoints
 @phone_numbers_bp.route('/phone-numbers/jwt', methods=['GET'])
 @require_auth('jwt')
 def get_phone_numbers_jwt():
-    phone_numbers = generate_mock_phone_numbers()
-    return jsonify({
-        'phone_numbers': phone_numbers,
+    phone_numbers, headers = phone_numbers_page()
+    return collection_response(phone_numbers, envelope={
+        'phone_numbers': ROWS,
         'auth_type': 'jwt',
         'user': getattr(request, 'user', {})
-    })
+    }, headers=headers)
 
 @phone_numbers_bp.route('/phone-numbers/api-key', methods=['GET'])
 @require_auth('api_key')
 def get_phone_numbers_api_key():
-    phone_numbers = generate_mock_phone_numbers()
-    return jsonify({
-        'phone_numbers': phone_numbers,
+    phone_numbers, headers = phone_numbers_page()
+    return collection_response(phone_numbers, envelope={
+        'phone_numbers': ROWS,
         'auth_type': 'api_key'
-    })
+    }, headers=headers)
+
+def phone_numbers_page():
+    """
+    Lazily generate the requested page of phone numbers and its pagination headers.
+    `count` is accepted as an alias of `limit`.
+    """
+    count = int_arg('count', 50)
+    total = current_app.config.get('RESOURCE_TOTALS', {}).get('phone_numbers', MAX_PHONE_NUMBERS)
+    page = current_page(total, count, max_limit=MAX_PHONE_NUMBERS)
+    phone_numbers = iter_mock_phone_numbers(page.stop - page.offset, page.seed, page.offset)
+    return phone_numbers, page.headers()
 
 def get_auth_context():
     """Extract authentication context from request"""
@@ -59,7 +74,10 @@ def get_auth_context():
     if auth_header.startswith('Bearer '):
         from ..auth import auth_manager
         token = auth_header[7:]
-        payload = auth_manager.verify_jwt_token(token)
+        if 'jwt_payload' in g:  # Already verified by require_auth
+            payload = g.jwt_payload
+        else:
+            payload = auth_manager.verify_jwt_token(token)
         if payload:
             return {'type': 'jwt', 'user': payload}
         else:
@@ -0,0 +1,23 @@
+# app/routes/resources.py
+from flask import Blueprint, request
+from ..pagination import paginated_response
+from ..relational import check_params, filtered_response, is_filtered
+from ..cache import cached_response
+
+def resource_view(schema):
+    """GET view serving pages of a compiled schema's resource"""
+    @cached_response(seeded=True)
+    def view():
+        check_params(schema, request.args)
+        if is_filtered(schema, request.args):
+            return filtered_response(schema)
+        return paginated_response(schema.resource, schema.envelope)
+    return view
+
+def resources_blueprint(schemas):
+    """One GET route per schema that declares a route"""
+    resources_bp = Blueprint('resources', __name__)
+    for name, schema in schemas.items():
+        if schema.route:
+            resources_bp.add_url_rule(schema.route, name, resource_view(schema), methods=['GET'])
+    return resources_bp
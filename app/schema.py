@@ -0,0 +1,373 @@
+# app/schema.py
+"""
+Declarative resource schemas.
+
+A schema is a JSON (or, with PyYAML installed, YAML) document:
+
+    {
+      "name": "orders",
+      "route": "/orders",
+      "total": 3,
+      "cycle": [{"max_quantity": 5}, {"max_quantity": 3}, ...],
+      "envelope": {"orders": "$rows"},
+      "indexes": {"hash": ["user_id"], "sorted": "order_date"},
+      "fields": {
+        "order_id": {"type": "id", "start": 1001},
+        "user_id": {"type": "ref", "ref": "users.id"},
+        "product_id": {"type": "ref", "ref": "products.id"},
+        "product": {"type": "lookup", "ref": "product_id", "field": "name"},
+        "quantity": {"type": "int", "min": 1, "max": "@max_quantity"},
+        "order_date": {"type": "datetime", "ago": {"unit": "days", "min": 1, "max": 365}}
+      }
+    }
+
+Row i takes the (i mod len(cycle))-th cycle entry; "@key" reads a value from
+it. Fields are generated in order, each drawing from the row's RowRandom
+stream, and every schema is compiled into a specialized make_row function
+with the stream inlined. A "lookup" field copies an id, const or cycle field
+of the row a "ref" field points at.
+
+An optional envelope wraps the rows, which take the place of "$rows".
+"indexes" lists the fields filtered queries look up by value ("hash") and
+the one that answers ?since=/?until= ranges ("sorted").
+"""
+from datetime import timedelta
+from string import Formatter
+import importlib.util
+import json
+import math
+import os
+from .dataset import Resource
+from .streaming import ROWS
+
+# PyYAML is optional, and only imported once a YAML schema is read
+HAS_YAML = importlib.util.find_spec('yaml') is not None
+
+# Schemas shipped with Mock-Box
+BUILTIN_SCHEMA_DIR = os.path.join(os.path.dirname(__file__), 'schemas')
+
+FIELD_TYPES = ('id', 'const', 'cycle', 'int', 'float', 'bool', 'enum', 'string', 'datetime', 'ref', 'lookup')
+
+TIME_UNITS = ('weeks', 'days', 'hours', 'minutes', 'seconds')
+
+class SchemaError(ValueError):
+    """Raised for an invalid resource schema"""
+
+class CompiledSchema:
+    """A compiled schema: its Resource plus how it is served"""
+
+    def __init__(self, resource, route=None, envelope=None, source='', fields=None, indexes=None):
+        self.resource = resource
+        self.route = route
+        self.envelope = envelope
+        self.source = source
+        # Field name -> field spec, in row order
+        self.fields = fields or {}
+        indexes = indexes or {}
+        self.hash_indexes = tuple(indexes.get('hash', ()))
+        self.sorted_index = indexes.get('sorted')
+
+class _Compiler:
+    """Generates the Python source of one schema's make_row function"""
+
+    def __init__(self, schema, schemas, id_fields, defaults):
+        self.name = schema['name']
+        self.schema = schema
+        self.schemas = schemas
+        self.id_fields = id_fields
+        self.defaults = defaults
+        self.cycle = schema.get('cycle') or []
+        self.cycle_keys = sorted({key for entry in self.cycle for key in entry})
+        self.constants = {}
+        self.locals = {}
+
+    def error(self, message):
+        return SchemaError(f"schema '{self.name}': {message}")
+
+    def constant(self, value):
+        """Name bound to `value` in the generated function's globals"""
+        name = f'_k{len(self.constants)}'
+        self.constants[name] = value
+        return name
+
+    def value(self, spec, field, key):
+        """Expression for a number given literally or as an "@key" cycle reference"""
+        value = spec.get(key)
+        if value is None:
+            raise self.error(f"field '{field}' needs '{key}'")
+        if isinstance(value, str) and value.startswith('@'):
+            return self.cycle_ref(value[1:], field)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise self.error(f"field '{field}': '{key}' must be a finite number or an @cycle reference")
+        return repr(value)
+
+    def bounds(self, spec, field):
+        """Expressions for a field's 'min' and 'max', checked for every cycle entry to satisfy min <= max"""
+        low, high = self.value(spec, field, 'min'), self.value(spec, field, 'max')
+        for entry in self.cycle or [{}]:
+            low_value, high_value = (self.bound(spec[key], entry, field) for key in ('min', 'max'))
+            if low_value > high_value:
+                raise self.error(f"field '{field}': min {low_value} is greater than max {high_value}")
+        return low, high
+
+    def bound(self, value, entry, field):
+        """A bound's value for one cycle entry"""
+        if not isinstance(value, str):
+            return value
+        value = entry.get(value[1:])
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise self.error(f"field '{field}': cycle values used as bounds must be finite numbers")
+        return value
+
+    def cycle_ref(self, key, field):
+        if key not in self.cycle_keys:
+            raise self.error(f"field '{field}' refers to unknown cycle key '{key}'")
+        return f'_c[{self.cycle_keys.index(key)}]'
+
+    def template(self, text, field):
+        """Expression concatenating a "{name}" template of fields, cycle keys, index and n"""
+        parts = []
+        for literal, name, spec, conversion in Formatter().parse(text):
+            if literal:
+                parts.append(repr(literal))
+            if name is None:
+                continue
+            if name == 'index':
+                expr = 'index'
+            elif name == 'n':
+                expr = '(index + 1)'
+            elif name in self.locals:
+                expr = self.locals[name]
+            elif name in self.cycle_keys:
+                expr = self.cycle_ref(name, field)
+            else:
+                raise self.error(f"field '{field}' template refers to unknown name '{name}'")
+            parts.append(f'format({expr}, {spec!r})' if spec else f'str({expr})')
+        return ' + '.join(parts) or "''"
+
+    def draw(self):
+        """
+        Emit one step of the row's RowRandom stream, inlined; returns the
+        name holding the 64-bit output
+        """
+        self.lines += [
+            '    _s = (_s + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF',
+            '    _z = ((_s ^ (_s >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF',
+            '    _z = ((_z ^ (_z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF',
+            '    _z ^= _z >> 31'
+        ]
+        return '_z'
+
+    def randint(self, low, high):
+        """Same result as RowRandom.randint(low, high)"""
+        span = f'{int(high) - int(low) + 1}' if _is_literal(low, high) else f'({high} - {low} + 1)'
+        return f'({low} + {self.draw()} % {span})'
+
+    def random(self):
+        """Same result as RowRandom.random()"""
+        return f'(({self.draw()} >> 11) * {1.0 / (1 << 53)!r})'
+
+    def field(self, field, spec):
+        kind = spec.get('type')
+        if kind == 'id':
+            return f"(index + {int(spec.get('start', 1))})"
+        if kind == 'const':
+            return self.constant(spec.get('value'))
+        if kind == 'cycle':
+            return self.cycle_ref(spec.get('key', field), field)
+        if kind == 'int':
+            return self.randint(*self.bounds(spec, field))
+        if kind == 'float':
+            low, high = self.bounds(spec, field)
+            span = repr(float(high) - float(low)) if _is_literal(low, high) else f'({high} - {low})'
+            expr = f'({low} + {span} * {self.random()})'
+            precision = spec.get('precision')
+            return expr if precision is None else f'round({expr}, {int(precision)})'
+        if kind == 'bool':
+            return f"({self.random()} < {float(spec.get('probability', 0.5))!r})"
+        if kind == 'enum':
+            values = spec.get('values')
+            if not values:
+                raise self.error(f"enum field '{field}' needs values")
+            return f'{self.constant(tuple(values))}[{self.draw()} % {len(values)}]'
+        if kind == 'string':
+            if 'format' not in spec:
+                raise self.error(f"string field '{field}' needs a format")
+            expr = self.template(spec['format'], field)
+            if 'unique_format' in spec:
+                # Used once the cycle repeats, so values stay unique
+                expr = f"({expr} if index < {len(self.cycle)} else {self.template(spec['unique_format'], field)})"
+            return expr
+        if kind == 'datetime':
+            ago = spec.get('ago') or {}
+            unit = ago.get('unit', 'days')
+            if unit not in TIME_UNITS:
+                raise self.error(f"datetime field '{field}': unit must be one of {', '.join(TIME_UNITS)}")
+            amount = self.randint(*self.bounds(ago, field))
+            expr = f'(now - _timedelta({unit}={amount}))'
+            if spec.get('format'):
+                expr = f"{expr}.strftime({spec['format']!r})"
+            return expr
+        if kind == 'ref':
+            target = spec.get('ref', '')
+            resource, _, key = target.partition('.')
+            start = self.id_fields.get((resource, key))
+            if start is None:
+                raise self.error(f"field '{field}' references '{target}', which is not an id field")
+            # Any id the referenced resource serves, looked up when the row is built
+            return f'({start} + {self.draw()} % _totals.get({resource!r}, {self.defaults[resource]}))'
+        if kind == 'lookup':
+            return self.lookup(field, spec)
+        raise self.error(f"field '{field}' has unknown type {kind!r}; expected one of {', '.join(FIELD_TYPES)}")
+
+    def lookup(self, field, spec):
+        """
+        A field of the row an earlier ref field points at. Only fields that
+        depend on the row number alone (id, const, cycle) can be looked up,
+        so no other row has to be generated.
+        """
+        ref_field = spec.get('ref')
+        ref_spec = (self.schema.get('fields') or {}).get(ref_field) or {}
+        if ref_spec.get('type') != 'ref' or ref_field not in self.locals:
+            raise self.error(f"lookup field '{field}' needs 'ref' naming an earlier ref field")
+        resource, _, key = ref_spec['ref'].partition('.')
+        position = f'({self.locals[ref_field]} - {self.id_fields[(resource, key)]})'
+        target = self.schemas[resource]
+        target_field = spec.get('field', field)
+        target_spec = (target.get('fields') or {}).get(target_field) or {}
+        kind = target_spec.get('type')
+        if kind == 'id':
+            return f"({position} + {int(target_spec.get('start', 1))})"
+        if kind == 'const':
+            return self.constant(target_spec.get('value'))
+        if kind == 'cycle':
+            cycle = target.get('cycle') or []
+            values = tuple(entry.get(target_spec.get('key', target_field)) for entry in cycle)
+            return f'{self.constant(values)}[{position} % {len(values)}]'
+        raise self.error(f"lookup field '{field}': {resource}.{target_field} must be an id, const or cycle field")
+
+    def source(self):
+        fields = self.schema.get('fields')
+        if not fields:
+            raise self.error('no fields defined')
+        self.lines = []
+        if self.cycle:
+            cycle = tuple(tuple(entry.get(key) for key in self.cycle_keys) for entry in self.cycle)
+            self.lines.append(f'    _c = {self.constant(cycle)}[index % {len(cycle)}]')
+        items = []
+        for position, (field, spec) in enumerate(fields.items()):
+            if not isinstance(spec, dict):
+                raise self.error(f"field '{field}' must be an object")
+            local = f'_f{position}'
+            expr = self.field(field, spec)
+            self.lines.append(f'    {local} = {expr}')
+            self.locals[field] = local
+            items.append(f'{field!r}: {local}')
+        self.lines.append(f"    return {{{', '.join(items)}}}")
+        body = self.lines
+        # make_row() takes a RowRandom; make_keyed_row() hashes (key, index)
+        # itself, sparing Resource.iter_rows a RowRandom per row
+        return '\n'.join([
+            'def make_row(rnd, index, now):',
+            '    _s = rnd._state',
+            *body,
+            '',
+            'def make_keyed_row(key, index, now):',
+            '    _z = key ^ ((index * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF)',
+            '    _z = ((_z ^ (_z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF',
+            '    _z = ((_z ^ (_z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF',
+            '    _s = _z ^ (_z >> 31)',
+            *body
+        ]) + '\n'
+
+def _is_literal(*expressions):
+    return all(not expression.startswith('_') for expression in expressions)
+
+def _envelope(value):
+    """Replace the "$rows" placeholder of an envelope with the streaming ROWS marker"""
+    if value == '$rows':
+        return ROWS
+    if isinstance(value, dict):
+        return {key: _envelope(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_envelope(item) for item in value]
+    return value
+
+def load_schema_file(path):
+    """Read one schema document"""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+            return yaml.safe_load(f)
+        return json.load(f)
+
+def schema_files(directory):
+    """Schema files in `directory`, skipping YAML when PyYAML is missing"""
+    if not directory or not os.path.isdir(directory):
+        return []
+    paths = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(('.yaml', '.yml')) and not HAS_YAML:
+            print(f"Warning: PyYAML is not installed, skipping schema {filename}")
+            continue
+        if filename.endswith(('.json', '.yaml', '.yml')):
+            paths.append(os.path.join(directory, filename))
+    return paths
+
+def compile_schemas(schemas, totals=None):
+    """
+    Compile schema documents into CompiledSchemas, keyed by resource name.
+    `totals` maps resource names to configured row counts; foreign keys
+    point at ids within the referenced resource's total.
+    """
+    by_name = {}
+    for schema in schemas:
+        if not isinstance(schema, dict) or not schema.get('name'):
+            raise SchemaError('every schema needs a name')
+        by_name[schema['name']] = schema
+
+    # Fields other resources can reference, with their first id
+    id_fields = {}
+    defaults = {}
+    for name, schema in by_name.items():
+        defaults[name] = int(schema.get('total') or len(schema.get('cycle') or []) or 10)
+        for field, spec in (schema.get('fields') or {}).items():
+            if isinstance(spec, dict) and spec.get('type') == 'id':
+                id_fields[(name, field)] = int(spec.get('start', 1))
+
+    compiled = {}
+    for name, schema in by_name.items():
+        compiler = _Compiler(schema, by_name, id_fields, defaults)
+        source = compiler.source()
+        namespace = dict(compiler.constants, _timedelta=timedelta, _totals=totals if totals is not None else {})
+        exec(compile(source, f'<schema {name}>', 'exec'), namespace)
+        resource = Resource(name, namespace['make_row'], total=defaults[name],
+                            make_keyed_row=namespace['make_keyed_row'])
+        fields = dict(schema['fields'])
+        indexes = schema.get('indexes') or {}
+        for field in [*indexes.get('hash', ()), *filter(None, [indexes.get('sorted')])]:
+            if field not in fields:
+                raise SchemaError(f"schema '{name}': index on unknown field '{field}'")
+        sorted_spec = fields.get(indexes.get('sorted'), {})
+        if indexes.get('sorted') and (sorted_spec.get('type') != 'datetime' or sorted_spec.get('format')):
+            raise SchemaError(f"schema '{name}': the sorted index must be on an unformatted datetime field")
+        compiled[name] = CompiledSchema(resource, schema.get('route'), _envelope(schema.get('envelope')),
+                                        source, fields, indexes)
+    return compiled
+
+def load_schemas(directories, totals=None):
+    """Load and compile every schema in `directories`; later directories override earlier ones"""
+    schemas = {}
+    for directory in directories:
+        for path in schema_files(directory):
+            schema = load_schema_file(path)
+            schemas[schema.get('name') if isinstance(schema, dict) else path] = schema
+    return compile_schemas(schemas.values(), totals)
+
+def init_schemas(app):
+    """Compile the built-in schemas plus those in [data] schema_dir"""
+    directories = [BUILTIN_SCHEMA_DIR]
+    if app.config.get('SCHEMA_DIR'):
+        directories.append(app.config['SCHEMA_DIR'])
+    schemas = app.extensions['schemas'] = load_schemas(directories, app.config.get('RESOURCE_TOTALS', {}))
+    return schemas
@@ -0,0 +1,105 @@
+# app/serve.py
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+import os
+import signal
+import socket
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Request handler that leaves per-request logging to the access log ([logging])"""
+
+    def log_request(self, code='-', size='-'):
+        pass
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Werkzeug WSGI server handling requests on a fixed-size thread pool"""
+    multithread = True
+
+    def __init__(self, *args, threads=8, **kwargs):
+        kwargs.setdefault('handler', QuietRequestHandler)
+        super().__init__(*args, **kwargs)
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='mock-box-worker')
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process_request_thread, request, client_address)
+
+    def _process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+def _exit_worker(signum, frame):
+    raise SystemExit(0)
+
+def _run_worker(host, port, threads, sock, overrides, use_asyncio):
+    from . import create_app
+    app = create_app(overrides)
+    try:
+        if use_asyncio:
+            from .asgi import serve_asyncio
+            serve_asyncio(app, sock, threads=threads)
+        else:
+            PooledWSGIServer(host, port, app, threads=threads, fd=sock.fileno()).serve_forever()
+    finally:
+        # Forked workers leave through os._exit, which skips atexit handlers
+        from .auth import auth_manager
+        auth_manager.flush_admin_keys()
+        access_log = app.extensions.get('access_log')
+        if access_log is not None:
+            access_log.close()
+
+def serve(host='127.0.0.1', port=5000, workers=1, threads=8, use_asyncio=False):
+    """
+    Serve the app from `workers` pre-forked processes sharing one listening
+    socket, each with a pool of `threads` request threads. With more than one
+    worker, tokens and admin keys are shared through the SQLite state backend.
+    With `use_asyncio`, each worker runs an asyncio event loop instead, and
+    `threads` only bounds the pool used for blocking routes.
+    """
+    overrides = {'DEBUG': False}
+    if workers > 1:
+        overrides['STATE_BACKEND'] = 'sqlite'
+
+    sock = socket.create_server((host, port), backlog=1024)
+    sock.set_inheritable(True)
+    mode = 'asyncio' if use_asyncio else 'threaded'
+    print(f"Serving on http://{host}:{port} with {workers} {mode} worker(s) x {threads} thread(s)")
+
+    if workers == 1:
+        try:
+            _run_worker(host, port, threads, sock, overrides, use_asyncio)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            # The parent relays Ctrl+C as SIGTERM; exit through finally blocks
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, _exit_worker)
+            try:
+                _run_worker(host, port, threads, sock, overrides, use_asyncio)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for pid in children:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+    sock.close()
@@ -0,0 +1,104 @@
+# app/shared_state.py
+import sqlite3
+import threading
+import time
+
+# Expired/over-capacity tokens are pruned once every this many adds
+PRUNE_INTERVAL = 1000
+
+class SqliteState:
+    """
+    SQLite database in WAL mode holding auth state shared by every worker
+    process on the host. Each thread keeps its own connection.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        db = self.connection()
+        db.execute('CREATE TABLE IF NOT EXISTS tokens (token TEXT PRIMARY KEY, expires_at REAL NOT NULL)')
+        db.execute('CREATE INDEX IF NOT EXISTS tokens_expires_at ON tokens (expires_at)')
+        db.execute('CREATE TABLE IF NOT EXISTS admin_keys (api_key TEXT PRIMARY KEY) WITHOUT ROWID')
+
+    def connection(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+        return db
+
+class SqliteTokenStore:
+    """TokenStore counterpart whose tokens are visible to every worker process"""
+
+    def __init__(self, state, max_tokens=1_000_000):
+        self.state = state
+        self.max_tokens = max_tokens
+        self._adds = 0
+
+    def add(self, token, ttl=None):
+        """Add a token that expires after `ttl` seconds (never when None)"""
+        expires_at = float('inf') if not ttl else time.time() + ttl
+        db = self.state.connection()
+        db.execute('INSERT OR REPLACE INTO tokens (token, expires_at) VALUES (?, ?)', (token, expires_at))
+        self._adds += 1
+        if self._adds % PRUNE_INTERVAL == 0:
+            self.sweep()
+
+    def sweep(self):
+        """Remove expired tokens, then the oldest ones beyond max_tokens"""
+        db = self.state.connection()
+        db.execute('DELETE FROM tokens WHERE expires_at <= ?', (time.time(),))
+        db.execute(
+            'DELETE FROM tokens WHERE rowid IN (SELECT rowid FROM tokens ORDER BY rowid DESC LIMIT -1 OFFSET ?)',
+            (self.max_tokens,)
+        )
+
+    def __contains__(self, token):
+        row = self.state.connection().execute(
+            'SELECT 1 FROM tokens WHERE token = ? AND expires_at > ?', (token, time.time())
+        ).fetchone()
+        return row is not None
+
+    def discard(self, token):
+        self.state.connection().execute('DELETE FROM tokens WHERE token = ?', (token,))
+
+    def clear(self):
+        self.state.connection().execute('DELETE FROM tokens')
+
+    def __iter__(self):
+        rows = self.state.connection().execute('SELECT token FROM tokens WHERE expires_at > ?', (time.time(),))
+        return iter([token for token, in rows])
+
+    def __len__(self):
+        return self.state.connection().execute(
+            'SELECT COUNT(*) FROM tokens WHERE expires_at > ?', (time.time(),)
+        ).fetchone()[0]
+
+class SqliteKeySet:
+    """Set of admin API keys shared by every worker process"""
+
+    def __init__(self, state):
+        self.state = state
+
+    def add(self, api_key):
+        self.state.connection().execute('INSERT OR IGNORE INTO admin_keys (api_key) VALUES (?)', (api_key,))
+
+    def update(self, api_keys):
+        self.state.connection().executemany(
+            'INSERT OR IGNORE INTO admin_keys (api_key) VALUES (?)', [(api_key,) for api_key in api_keys]
+        )
+
+    def discard(self, api_key):
+        self.state.connection().execute('DELETE FROM admin_keys WHERE api_key = ?', (api_key,))
+
+    def __contains__(self, api_key):
+        row = self.state.connection().execute('SELECT 1 FROM admin_keys WHERE api_key = ?', (api_key,)).fetchone()
+        return row is not None
+
+    def __iter__(self):
+        return iter([api_key for api_key, in self.state.connection().execute('SELECT api_key FROM admin_keys')])
+
+    def __len__(self):
+        return self.state.connection().execute('SELECT COUNT(*) FROM admin_keys').fetchone()[0]
@@ -0,0 +1,217 @@
+# app/snapshot.py
+"""
+Binary snapshots of materialized tables.
+
+A snapshot file is an 8-byte magic, an 8-byte header length, a JSON header
+and 8-byte aligned data sections holding the raw column arrays and index
+arrays. Loading maps the file and casts its sections in place, so opening a
+snapshot costs the same whatever its size, and worker processes mapping the
+same file share its pages through the OS page cache.
+"""
+from array import array
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from .columnar import (
+    BoolColumn, ConstColumn, DateTimeColumn, DictionaryColumn, FloatColumn, IntColumn,
+    RowNumberColumn, StringColumn
+)
+
+MAGIC = b'MBXSNAP1'
+ALIGNMENT = 8
+
+class SnapshotError(ValueError):
+    """Raised for a missing, stale or corrupt snapshot file"""
+
+class PackedIndex:
+    """
+    Hash index laid out as flat arrays: the distinct stored keys in order,
+    where each key's positions start, and every position. Keys are values as
+    the column stores them (dictionary codes, microseconds, 0/1).
+    """
+
+    def __init__(self, column, keys, starts, positions):
+        self.column = column
+        self.keys = keys
+        self.starts = starts
+        self.positions = positions
+
+    @classmethod
+    def from_column(cls, column):
+        buckets = {}
+        for position, key in enumerate(column.data):
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = array('I')
+            bucket.append(position)
+        keys = array('d' if isinstance(column, FloatColumn) else 'q', sorted(buckets))
+        starts, positions = array('Q', [0]), array('I')
+        for key in keys:
+            positions.extend(buckets[key])
+            starts.append(len(positions))
+        return cls(column, keys, starts, positions)
+
+    def get(self, value, default=()):
+        key = stored_key(self.column, value)
+        if key is None:
+            return default
+        i = bisect.bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return default
+        return self.positions[self.starts[i]:self.starts[i + 1]]
+
+def stored_key(column, value):
+    """A value as the column stores it, or None if it never occurs"""
+    if isinstance(column, DictionaryColumn):
+        return column.code_of(value)
+    if isinstance(column, DateTimeColumn):
+        return column.encode(value)
+    if isinstance(column, BoolColumn):
+        return 1 if value else 0
+    return value
+
+def packable(column):
+    """Whether a column's hash index can be stored as flat arrays"""
+    return isinstance(column, (IntColumn, FloatColumn, BoolColumn, DateTimeColumn, DictionaryColumn))
+
+def fingerprint(schema, totals):
+    """Identifies the generated data: the compiled schema and the row counts it refers to"""
+    raw = json.dumps(
+        [schema.source, schema.fields, schema.hash_indexes, schema.sorted_index, totals],
+        sort_keys=True, default=str
+    )
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=8).hexdigest()
+
+def snapshot_path(directory, name, seed, total, digest):
+    return os.path.join(directory, f'{name}-{seed}-{total}-{digest}.snap')
+
+class _Writer:
+    """Lays out data sections and records where each one lives"""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def section(self, data):
+        if isinstance(data, array):
+            typecode, raw = data.typecode, data.tobytes()
+        else:
+            typecode, raw = 'B', bytes(data)
+        offset = self.size
+        padding = -len(raw) % ALIGNMENT
+        self.chunks.append(raw + b'\0' * padding)
+        self.size += len(raw) + padding
+        return [offset, typecode, len(raw)]
+
+def write_snapshot(path, table, meta):
+    """Write a table to `path` atomically"""
+    writer = _Writer()
+    columns = []
+    for name, column in table.columns.items():
+        entry = {'name': name, 'kind': column.kind}
+        if isinstance(column, RowNumberColumn):
+            entry.update(start=column.start, length=len(column))
+        elif isinstance(column, ConstColumn):
+            entry.update(value=column.value, length=len(column))
+        elif isinstance(column, DictionaryColumn):
+            entry.update(values=column.values, codes=writer.section(column.codes))
+        elif isinstance(column, StringColumn):
+            entry.update(blob=writer.section(column.blob), offsets=writer.section(column.offsets))
+        else:
+            entry.update(data=writer.section(column.data))
+        columns.append(entry)
+
+    hash_indexes = {}
+    for field, index in table.hash_indexes.items():
+        column = table.columns[field]
+        if not packable(column):
+            continue
+        if not isinstance(index, PackedIndex):
+            index = PackedIndex.from_column(column)
+        hash_indexes[field] = {
+            'keys': writer.section(index.keys),
+            'starts': writer.section(index.starts),
+            'positions': writer.section(index.positions)
+        }
+
+    header = dict(meta, columns=columns, hash_indexes=hash_indexes, sorted_field=table.sorted_field)
+    if table.sorted_field:
+        header['sorted_positions'] = writer.section(table.sorted_positions)
+    raw_header = json.dumps(header).encode('utf-8')
+    raw_header += b' ' * (-len(raw_header) % ALIGNMENT)
+
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC + struct.pack('<Q', len(raw_header)) + raw_header)
+            for chunk in writer.chunks:
+                f.write(chunk)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def load_snapshot(path, table_class, meta):
+    """
+    Map a snapshot and return a table_class instance over it. `meta` must
+    match the header, so a stale snapshot is never served.
+    """
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        raise SnapshotError(f'Cannot open snapshot {path}: {e}')
+    if len(mapped) < len(MAGIC) + 8 or mapped[:len(MAGIC)] != MAGIC:
+        raise SnapshotError(f'{path} is not a snapshot')
+    header_length, = struct.unpack_from('<Q', mapped, len(MAGIC))
+    data_start = len(MAGIC) + 8 + header_length
+    try:
+        header = json.loads(bytes(mapped[len(MAGIC) + 8:data_start]))
+    except ValueError:
+        raise SnapshotError(f'{path} has a corrupt header')
+    if any(header.get(key) != value for key, value in meta.items()):
+        raise SnapshotError(f'{path} does not match the current schema')
+
+    view = memoryview(mapped)
+
+    def section(ref):
+        offset, typecode, length = ref
+        start = data_start + offset
+        if start + length > len(mapped):
+            raise SnapshotError(f'{path} is truncated')
+        return view[start:start + length].cast(typecode)
+
+    columns = {}
+    for entry in header['columns']:
+        kind = entry['kind']
+        if kind == 'row_number':
+            column = RowNumberColumn(entry['start'])
+            column.length = entry['length']
+        elif kind == 'const':
+            column = ConstColumn(entry['value'])
+            column.length = entry['length']
+        elif kind == 'dictionary':
+            column = DictionaryColumn(entry['values'], section(entry['codes']))
+        elif kind == 'string':
+            column = StringColumn(section(entry['blob']), section(entry['offsets']))
+        else:
+            column_class = {'int': IntColumn, 'float': FloatColumn, 'bool': BoolColumn, 'datetime': DateTimeColumn}[kind]
+            column = column_class(section(entry['data']))
+        columns[entry['name']] = column
+
+    hash_indexes = {
+        field: PackedIndex(columns[field], section(refs['keys']), section(refs['starts']), section(refs['positions']))
+        for field, refs in header['hash_indexes'].items()
+    }
+    sorted_positions = section(header['sorted_positions']) if header.get('sorted_positions') else None
+    table = table_class(columns, meta.get('hash_fields', ()), header['sorted_field'], hash_indexes, sorted_positions)
+    # Keeps the mapping alive as long as the table
+    table.snapshot = mapped
+    return table
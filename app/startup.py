@@ -0,0 +1,73 @@
+# app/startup.py
+from collections import defaultdict
+import json
+import subprocess
+import sys
+
+# Runs in a fresh interpreter, so every import is paid for again
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+app = create_app(json.loads(sys.argv[1]))
+created = time.perf_counter()
+print('-- create_app done', file=sys.stderr, flush=True)
+timings = {'create_app_ms': (created - started) * 1000}
+if sys.argv[2]:
+    status = app.test_client().get(sys.argv[2]).status_code
+    timings['first_request_ms'] = (time.perf_counter() - created) * 1000
+    timings['first_request_status'] = status
+print(json.dumps(timings))
+'''
+
+def module_group(name):
+    """App modules are reported one by one; anything else by its top-level package"""
+    return name if name.startswith('app.') or name == 'app' else name.split('.')[0]
+
+def parse_importtime(lines):
+    """Sum `python -X importtime` self times (ms) per module group"""
+    totals = defaultdict(float)
+    for line in lines:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        totals[module_group(name.strip())] += int(self_us) / 1000
+    return totals
+
+def startup_report(path=None, top=20, overrides=None):
+    """
+    Start the app in a child interpreter with -X importtime and print a JSON
+    report: create_app time, the first request's time (when `path` is given)
+    and the costliest imports.
+    """
+    overrides = dict(overrides or {})
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE, json.dumps(overrides), path or ''],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        return result.returncode
+    lines = result.stderr.splitlines()
+    marker = lines.index('-- create_app done')
+    imports = parse_importtime(lines[:marker])
+    deferred = parse_importtime(lines[marker + 1:])
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report.update(
+        import_ms=round(sum(imports.values()), 2),
+        imports=[
+            {'module': name, 'ms': round(ms, 2)}
+            for name, ms in sorted(imports.items(), key=lambda item: -item[1])[:top]
+        ]
+    )
+    if path:
+        # Imported while serving the first request
+        report['first_request_imports'] = [
+            {'module': name, 'ms': round(ms, 2)}
+            for name, ms in sorted(deferred.items(), key=lambda item: -item[1])[:top]
+        ]
+    for key in ('create_app_ms', 'first_request_ms'):
+        if key in report:
+            report[key] = round(report[key], 2)
+    print(json.dumps(report, indent=2))
+    return 0
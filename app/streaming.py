@@ -0,0 +1,73 @@
+# app/streaming.py
+from flask import Response, current_app, jsonify, request, stream_with_context
+from itertools import islice
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Placeholder marking where the streamed rows go inside a response envelope
+ROWS = '__mock_box_stream_rows__'
+
+# Rows serialized per chunk handed to the WSGI server
+CHUNK_SIZE = 500
+
+def stream_mode():
+    """Return 'ndjson', 'json' or None depending on how the client asked for the response"""
+    # Only an explicit Accept entry selects NDJSON; wildcards keep plain JSON
+    if any(value == NDJSON_MIMETYPE and quality > 0 for value, quality in request.accept_mimetypes):
+        return 'ndjson'
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return 'json'
+    return None
+
+def collection_response(rows, envelope=None, headers=None):
+    """
+    Respond with a collection of rows, streaming it when requested.
+    `rows` may be any iterable (ideally a generator); `envelope` is an optional
+    JSON structure holding the ROWS placeholder where the collection belongs.
+    """
+    mode = stream_mode()
+    if mode == 'ndjson':
+        return Response(stream_with_context(_iter_ndjson(rows)), mimetype=NDJSON_MIMETYPE, headers=headers)
+    if mode == 'json':
+        return Response(stream_with_context(_iter_json(rows, envelope)), mimetype='application/json', headers=headers)
+
+    if envelope is None:
+        response = jsonify(list(rows))
+    else:
+        response = jsonify(_fill_envelope(envelope, list(rows)))
+    if headers:
+        response.headers.update(headers)
+    return response
+
+def _iter_chunks(rows):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, CHUNK_SIZE))
+        if not chunk:
+            return
+        yield chunk
+
+def _iter_ndjson(rows):
+    dumps = current_app.json.dumps
+    for chunk in _iter_chunks(rows):
+        yield ''.join([dumps(row) + '\n' for row in chunk])
+
+def _iter_json(rows, envelope):
+    dumps = current_app.json.dumps
+    prefix, suffix = '', ''
+    if envelope is not None:
+        prefix, suffix = dumps(envelope).split(dumps(ROWS), 1)
+
+    yield prefix + '['
+    separator = ''
+    for chunk in _iter_chunks(rows):
+        yield separator + ','.join([dumps(row) for row in chunk])
+        separator = ','
+    yield ']' + suffix
+
+def _fill_envelope(envelope, rows):
+    if envelope == ROWS:
+        return rows
+    if isinstance(envelope, dict):
+        return {key: _fill_envelope(value, rows) for key, value in envelope.items()}
+    return envelope
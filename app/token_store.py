@@ -0,0 +1,93 @@
+# app/token_store.py
+import heapq
+import threading
+import time
+
+NEVER = float('inf')
+
+class _Shard:
+    __slots__ = ('tokens', 'expiries', 'lock')
+
+    def __init__(self):
+        self.tokens = {}     # token -> expires_at, in insertion order
+        self.expiries = []   # heap of (expires_at, token) for tokens that expire
+        self.lock = threading.Lock()
+
+class TokenStore:
+    """
+    Thread-safe set of generated tokens with per-token expiry.
+    Tokens are spread over independently locked shards so request threads
+    rarely contend; lookups are a lock-free dict read. Expired tokens are
+    swept from a per-shard heap as new tokens are added, and each shard is
+    capped so memory stays bounded however many tokens are minted.
+    """
+
+    def __init__(self, max_tokens=1_000_000, shards=16):
+        self.max_tokens = max_tokens
+        self._shards = [_Shard() for _ in range(shards)]
+
+    def _shard(self, token):
+        return self._shards[hash(token) % len(self._shards)]
+
+    def add(self, token, ttl=None):
+        """Add a token that expires after `ttl` seconds (never when None)"""
+        now = time.time()
+        expires_at = NEVER if not ttl else now + ttl
+        shard = self._shard(token)
+        with shard.lock:
+            self._sweep(shard, now)
+            shard.tokens[token] = expires_at
+            if expires_at != NEVER:
+                heapq.heappush(shard.expiries, (expires_at, token))
+            # Evict the oldest tokens once the shard is over its share of the cap
+            limit = max(1, self.max_tokens // len(self._shards))
+            while len(shard.tokens) > limit:
+                del shard.tokens[next(iter(shard.tokens))]
+
+    def _sweep(self, shard, now):
+        expiries, tokens = shard.expiries, shard.tokens
+        while expiries and expiries[0][0] <= now:
+            expires_at, token = heapq.heappop(expiries)
+            if tokens.get(token) == expires_at:
+                del tokens[token]
+        # Drop heap entries left behind by evicted or discarded tokens
+        if len(expiries) > 2 * len(tokens) + 64:
+            shard.expiries = [(expires_at, token) for token, expires_at in tokens.items() if expires_at != NEVER]
+            heapq.heapify(shard.expiries)
+
+    def sweep(self):
+        """Remove every expired token"""
+        now = time.time()
+        for shard in self._shards:
+            with shard.lock:
+                self._sweep(shard, now)
+
+    def __contains__(self, token):
+        expires_at = self._shard(token).tokens.get(token)
+        return expires_at is not None and expires_at > time.time()
+
+    def discard(self, token):
+        shard = self._shard(token)
+        with shard.lock:
+            shard.tokens.pop(token, None)
+
+    def clear(self):
+        for shard in self._shards:
+            with shard.lock:
+                shard.tokens.clear()
+                shard.expiries.clear()
+
+    def __iter__(self):
+        now = time.time()
+        live = []
+        for shard in self._shards:
+            with shard.lock:
+                live.extend(token for token, expires_at in shard.tokens.items() if expires_at > now)
+        return iter(live)
+
+    def __len__(self):
+        now = time.time()
+        return sum(
+            sum(1 for expires_at in shard.tokens.values() if expires_at > now)
+            for shard in self._shards
+        )
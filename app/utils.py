@@ -1,8 +1,54 @@
 # app/utils.py
 import random
+from itertools import chain
+from .dataset import resource_key, counter_hash
 
-def generate_mock_phone_numbers(count=50):
-    return [f"+26588{''.join(str(random.randint(0, 9)) for _ in range(7))}" for _ in range(count)]
+PHONE_PREFIX = "+26588"
+PHONE_DIGITS = 7
+MAX_PHONE_NUMBERS = 5_000_000
+PHONE_BATCH_SIZE = 16384
+
+# Maps a random byte onto an ASCII digit ('0'-'9') in a single C-level pass
+_DIGIT_TABLE = bytes(48 + (b * 10 >> 8) for b in range(256))
+
+def generate_mock_phone_numbers(count=50, seed=None):
+    """Generate phone numbers from bulk draws of a seeded RNG"""
+    return list(chain.from_iterable(iter_mock_phone_number_batches(count, seed)))
+
+def iter_mock_phone_numbers(count=50, seed=None, start=0):
+    """Lazily yield phone numbers; same sequence as generate_mock_phone_numbers"""
+    return chain.from_iterable(iter_mock_phone_number_batches(count, seed, start))
+
+def iter_mock_phone_number_batches(count=50, seed=None, start=0):
+    """
+    Yield lists of phone numbers [start, start + count).
+    Numbers are drawn in fixed blocks of PHONE_BATCH_SIZE, each from an RNG
+    seeded by hashing (seed, block), so any offset is reachable directly.
+    """
+    remaining = max(0, min(int(count), MAX_PHONE_NUMBERS))
+    key = resource_key(seed, 'phone_numbers')
+    block, offset = divmod(start, PHONE_BATCH_SIZE)
+    while remaining:
+        size = min(remaining, PHONE_BATCH_SIZE - offset)
+        yield _phone_number_batch(random.Random(counter_hash(key, block)), offset, size)
+        remaining -= size
+        block, offset = block + 1, 0
+
+def _phone_number_batch(rng, offset, count):
+    # randbytes(n) trims its last 32-bit word depending on n; drawing whole
+    # words keeps every number a function of (seed, index) alone
+    end = (offset + count) * PHONE_DIGITS
+    draw = rng.randbytes(-(-end // 4) * 4)
+    digits = draw[offset * PHONE_DIGITS:end].translate(_DIGIT_TABLE)
+
+    # Lay out "<prefix><digits>\n" records and fill each digit column with
+    # one extended-slice assignment instead of formatting numbers one by one
+    width = len(PHONE_PREFIX) + PHONE_DIGITS + 1
+    buffer = bytearray((PHONE_PREFIX + '0' * PHONE_DIGITS + '\n').encode('ascii') * count)
+    for column in range(PHONE_DIGITS):
+        buffer[len(PHONE_PREFIX) + column::width] = digits[column::PHONE_DIGITS]
+
+    return buffer[:-1].decode('ascii').split('\n')
 
 def generate_mock_names(count=10):
     names = ["Alice", "Bob", "Charlie", "David", "Eve", "Frank", "Grace", "Hank", "Ivy", "Jack"]
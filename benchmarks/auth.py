@@ -0,0 +1,54 @@
+# benchmarks/auth.py
+"""Time require_auth for each auth type on /api/auth/protected.
+
+For every scheme this reports the full in-process request (test client) and
+the decorator alone, wrapped around a no-op view inside a request context.
+Run from the repository root:
+    python -m benchmarks.auth [iterations]
+"""
+import base64
+import sys
+import time
+
+from app import create_app
+from app.auth import auth_manager, require_auth
+
+def per_call_us(call, iterations):
+    call()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    app = create_app({'DEBUG': False, 'ACCESS_LOG': ''})
+    client = app.test_client()
+    jwt_token = client.post('/api/auth/jwt-token', json={}).get_json()['access_token']
+    api_key = client.get('/api/auth/api-key').get_json()['api_key']
+    oauth_token = client.post('/api/auth/oauth-token').get_json()['access_token']
+    # Well-formed JWT signed with another key: always rejected
+    header, payload, _ = jwt_token.split('.')
+    forged = f'{header}.{payload}.{"A" * 43}'
+    schemes = {
+        'jwt': f'Bearer {jwt_token}',
+        'api_key': f'ApiKey {api_key}',
+        'basic': 'Basic ' + base64.b64encode(b'user:secret').decode('ascii'),
+        'bearer': f'Bearer {oauth_token}',
+        'invalid (opaque)': 'Bearer not-a-token',
+        'invalid (forged jwt)': f'Bearer {forged}'
+    }
+
+    noop = require_auth('any')(lambda: None)
+    print(f"{'scheme':<22} {'request us':>11} {'decorator us':>13} {'status':>7}")
+    for name, authorization in schemes.items():
+        headers = {'Authorization': authorization}
+        status = client.get('/api/auth/protected', headers=headers).status_code
+        request_us = per_call_us(lambda: client.get('/api/auth/protected', headers=headers), iterations // 10)
+        with app.test_request_context('/api/auth/protected', headers=headers):
+            decorator_us = per_call_us(noop, iterations)
+        print(f"{name:<22} {request_us:>11.1f} {decorator_us:>13.2f} {status:>7}")
+    auth_manager.clear_jwt_cache()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+# benchmarks/columnar.py
+"""Compare the memory of a materialized resource held as row dicts and as columns.
+
+Run from the repository root:
+    python -m benchmarks.columnar [rows] [resource]
+"""
+import sys
+import time
+import tracemalloc
+
+from app.relational import Table
+from app.schema import BUILTIN_SCHEMA_DIR, load_schemas
+
+def measure(build):
+    """Return (bytes still allocated by the result, seconds to build it)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    name = sys.argv[2] if len(sys.argv) > 2 else 'credit_lines'
+    schema = load_schemas([BUILTIN_SCHEMA_DIR])[name]
+
+    dicts, dict_bytes, dict_time = measure(lambda: list(schema.resource.iter_rows(42, 0, rows)))
+    del dicts
+    table, table_bytes, table_time = measure(
+        lambda: Table.from_rows(schema.resource.iter_rows(42, 0, rows), schema.fields)
+    )
+    assert table.row(rows - 1) == schema.resource.row(rows - 1, 42)
+
+    print(f"resource: {name}, {rows:,} rows")
+    print(f"dicts:    {dict_bytes / rows:7.1f} bytes/row  ({dict_bytes / 2**20:,.0f} MiB, built in {dict_time:.1f}s)")
+    print(f"columns:  {table_bytes / rows:7.1f} bytes/row  ({table_bytes / 2**20:,.0f} MiB, built in {table_time:.1f}s)")
+    print(f"ratio:    {dict_bytes / table_bytes:.1f}x smaller")
+    for field, column in table.columns.items():
+        print(f"  {field:<16}{type(column).__name__:<20}{column.nbytes / rows:6.1f} bytes/row")
+
+if __name__ == '__main__':
+    main()
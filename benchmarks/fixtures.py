@@ -0,0 +1,44 @@
+# benchmarks/fixtures.py
+"""Open and query a large fixture file: startup and lookups should not grow with its size.
+
+Run from the repository root:
+    python -m benchmarks.fixtures [fixtures]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from app.fixtures import FixtureStore, request_key, write_fixtures
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    keys = [request_key('GET', f'/api/items/{i}', [('page', str(i % 7))]) for i in range(count)]
+    headers = [['Content-Type', 'application/json']]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'fixtures.mbx')
+        start = time.perf_counter()
+        write_fixtures(path, ((key, 200, headers, b'{"id": %d}' % i) for i, key in enumerate(keys)))
+        print(f"fixtures: {count:,} ({os.path.getsize(path) / 2**20:.1f} MiB, written and indexed in {time.perf_counter() - start:.1f}s)")
+
+        start = time.perf_counter()
+        store = FixtureStore(path)
+        print(f"open:     {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+        sample = random.Random(0).sample(range(count), min(count, 100_000))
+        start = time.perf_counter()
+        for i in sample:
+            fixture = store.get(keys[i])
+        elapsed = time.perf_counter() - start
+        assert bytes(fixture.body) == b'{"id": %d}' % sample[-1]
+        print(f"lookup:   {elapsed / len(sample) * 1e6:.2f} us")
+
+        missing = request_key('GET', '/api/none', [])
+        start = time.perf_counter()
+        for _ in range(len(sample)):
+            store.get(missing)
+        print(f"miss:     {(time.perf_counter() - start) / len(sample) * 1e6:.2f} us")
+
+if __name__ == '__main__':
+    main()
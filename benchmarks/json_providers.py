@@ -0,0 +1,75 @@
+# benchmarks/json_providers.py
+"""Compare JSON provider serialization speed across the existing endpoints.
+
+Run from the repository root:
+    python -m benchmarks.json_providers [rows]
+"""
+import logging
+import sys
+import time
+
+from app import create_app
+from app.dataset import RESOURCES as RESOURCE_REGISTRY
+from app.json_provider import available_providers, init_json_provider
+
+ENDPOINTS = [
+    '/api/products',
+    '/api/users',
+    '/api/orders',
+    '/api/credit-lines',
+    '/api/user-activities',
+    '/api/rss-feed',
+    '/api/phone-numbers/public'
+]
+
+RESOURCES = ('products', 'users', 'orders', 'credit_lines', 'user_activities', 'rss_feed')
+
+def make_app(provider, rows):
+    """App using `provider`, with the response cache off and every resource `rows` long"""
+    app = create_app()
+    app.debug = False
+    app.logger.setLevel(logging.WARNING)
+    app.config['JSON_PROVIDER'] = provider
+    app.config['RESOURCE_TOTALS'] = {resource: rows for resource in RESOURCES}
+    app.extensions.pop('response_cache', None)
+    init_json_provider(app)
+    return app
+
+def measure(func, repeat=5):
+    """Return the best wall time of a call"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def print_table(title, names, providers, results):
+    print(f"\n{title}")
+    print(f"{'':<28}" + ''.join(f"{provider:>12}" for provider in providers))
+    for name in names:
+        print(f"{name:<28}" + ''.join(f"{results[(name, provider)] * 1000:>10.1f}ms" for provider in providers))
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    providers = available_providers()
+    requests, serialize = {}, {}
+    for provider in providers:
+        app = make_app(provider, rows)
+        client = app.test_client()
+        for endpoint in ENDPOINTS:
+            url = f'{endpoint}?seed=1&limit={rows}'
+            requests[(endpoint, provider)] = measure(lambda: client.get(url))
+
+        # Serialization alone, on rows generated up front
+        with app.app_context():
+            for resource in RESOURCES:
+                data = list(RESOURCE_REGISTRY[resource].iter_rows(1, 0, rows))
+                serialize[(resource, provider)] = measure(lambda: app.json.response(data))
+
+    print(f"rows per response: {rows}")
+    print_table('full request', ENDPOINTS, providers, requests)
+    print_table('serialization only', RESOURCES, providers, serialize)
+
+if __name__ == '__main__':
+    main()
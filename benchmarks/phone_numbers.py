@@ -0,0 +1,36 @@
+# benchmarks/phone_numbers.py
+"""Compare phone number generation throughput before and after batching.
+
+Run from the repository root:
+    python -m benchmarks.phone_numbers [count]
+"""
+import random
+import sys
+import time
+
+from app.utils import generate_mock_phone_numbers
+
+def legacy_generate_mock_phone_numbers(count=50):
+    """Original implementation: seven randint calls per number"""
+    return [f"+26588{''.join(str(random.randint(0, 9)) for _ in range(7))}" for _ in range(count)]
+
+def measure(func, count, repeat=3):
+    """Return the best numbers/sec over a few runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(count)
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    before = measure(legacy_generate_mock_phone_numbers, count)
+    after = measure(lambda n: generate_mock_phone_numbers(n, seed=42), count)
+    print(f"count:   {count}")
+    print(f"before:  {before:,.0f} numbers/sec")
+    print(f"after:   {after:,.0f} numbers/sec")
+    print(f"speedup: {after / before:.1f}x")
+
+if __name__ == '__main__':
+    main()
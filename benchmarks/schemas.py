@@ -0,0 +1,91 @@
+# benchmarks/schemas.py
+"""Compare compiled schema row generators with equivalent hand-written ones.
+
+Run from the repository root:
+    python -m benchmarks.schemas [rows]
+"""
+from datetime import timedelta
+import sys
+import time
+
+from app.dataset import REFERENCE_TIME, RowRandom, resource_key
+from app.schema import BUILTIN_SCHEMA_DIR, load_schemas
+
+PRODUCTS = [
+    ("Laptop", 500, 1500, True),
+    ("Smartphone", 200, 800, False),
+    ("Headphones", 50, 300, True),
+    ("Monitor", 100, 400, True),
+    ("Keyboard", 20, 100, False)
+]
+
+NAMES = ["Alice", "Bob", "Charlie", "Diana"]
+
+STATUSES = ["active", "inactive", "overdue"]
+
+def legacy_product(rnd, index, now):
+    name, low, high, in_stock = PRODUCTS[index % len(PRODUCTS)]
+    return {"id": index + 1, "name": name, "price": round(rnd.uniform(low, high), 2), "in_stock": in_stock}
+
+def legacy_user(rnd, index, now):
+    name = NAMES[index % len(NAMES)]
+    if index < len(NAMES):
+        email = f"{name.lower()}@example.com"
+    else:
+        email = f"{name.lower()}.{index + 1}@example.com"
+    return {"id": index + 1, "name": name, "email": email, "joined_date": now - timedelta(days=rnd.randint(1, 1000))}
+
+def legacy_order(rnd, index, now):
+    user_id = 1 + rnd.randint(0, len(NAMES) - 1)
+    product_id = 1 + rnd.randint(0, len(PRODUCTS) - 1)
+    return {
+        "order_id": 1001 + index,
+        "user_id": user_id,
+        "product_id": product_id,
+        "product": PRODUCTS[(product_id - 1) % len(PRODUCTS)][0],
+        "quantity": rnd.randint(1, 5),
+        "total_price": round(rnd.uniform(20, 2000), 2),
+        "order_date": now - timedelta(days=rnd.randint(1, 365))
+    }
+
+def legacy_credit_line(rnd, index, now):
+    user_id = 1 + rnd.randint(0, len(NAMES) - 1)
+    return {
+        "credit_line_id": index + 1,
+        "user_id": user_id,
+        "customer_name": NAMES[(user_id - 1) % len(NAMES)],
+        "credit_limit": round(rnd.uniform(1000, 10000), 2),
+        "balance": round(rnd.uniform(0, 10000), 2),
+        "status": rnd.choice(STATUSES)
+    }
+
+LEGACY = {
+    'products': legacy_product,
+    'users': legacy_user,
+    'orders': legacy_order,
+    'credit_lines': legacy_credit_line
+}
+
+def measure(generate, rows, repeat=3):
+    """Return the best rows/sec over a few runs, and the rows produced"""
+    best, produced = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        produced = generate()
+        best = min(best, time.perf_counter() - start)
+    return rows / best, produced
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    schemas = load_schemas([BUILTIN_SCHEMA_DIR])
+    print(f"{'':<16}{'hand-written':>16}{'compiled':>16}{'speedup':>10}  identical")
+    for name, legacy in LEGACY.items():
+        key = resource_key(42, name)
+        before, expected = measure(
+            lambda: [legacy(RowRandom(key, index), index, REFERENCE_TIME) for index in range(rows)], rows
+        )
+        after, produced = measure(lambda: list(schemas[name].resource.iter_rows(42, 0, rows)), rows)
+        print(f"{name:<16}{before:>12,.0f} r/s{after:>12,.0f} r/s{after / before:>9.1f}x  {produced == expected}")
+
+if __name__ == '__main__':
+    main()
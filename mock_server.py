@@ -1,7 +1,66 @@
 # mock_server.py
-from app import create_app
+import argparse
 
-app = create_app()
+def __getattr__(name):
+    """
+    `app`, and the ASGI entry point for external servers (e.g.
+    `uvicorn mock_server:asgi_app`), are created on first access, so the
+    commands below only build the apps they use.
+    """
+    global app, asgi_app
+    if name not in ('app', 'asgi_app'):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from app import create_app
+    from app.asgi import AsgiApp
+    app = create_app()
+    asgi_app = AsgiApp(app)
+    return globals()[name]
 
 if __name__ == '__main__':
-    app.run(port=app.config['PORT'], debug=app.config['DEBUG'])
\ No newline at end of file
+    from app import load_config
+    config = load_config()
+
+    parser = argparse.ArgumentParser(description='Mock-Box mock API server')
+    commands = parser.add_subparsers(dest='command')
+
+    serve_parser = commands.add_parser('serve', help='Run the production server with N worker processes')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=config['PORT'])
+    serve_parser.add_argument('--workers', type=int, default=1, help='Number of worker processes')
+    serve_parser.add_argument('--threads', type=int, default=8, help='Request threads per worker')
+    serve_parser.add_argument('--asyncio', action='store_true', help='Serve from an asyncio event loop per worker')
+
+    bench_parser = commands.add_parser('bench', help='Load-test every /api route and report JSON')
+    bench_parser.add_argument('--concurrency', type=int, default=8, help='Concurrent connections per route')
+    bench_parser.add_argument('--requests', type=int, default=200, help='Requests per route and auth scheme')
+    bench_parser.add_argument('--url', help='Benchmark an already running server instead of an in-process one')
+    bench_parser.add_argument('--match', help='Only benchmark routes containing this text')
+    bench_parser.add_argument('--baseline', help='Baseline report to compare against')
+    bench_parser.add_argument('--save-baseline', help='Write the results as a new baseline file')
+    bench_parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative regression (default 0.2)')
+    bench_parser.add_argument('--output', help='Also write the JSON report to this file')
+
+    startup_parser = commands.add_parser('startup', help='Report create_app time and per-module import cost')
+    startup_parser.add_argument('--path', help='Also time the first request to this path')
+    startup_parser.add_argument('--top', type=int, default=20, help='Number of modules to list')
+
+    args = parser.parse_args()
+    if args.command == 'bench':
+        import sys
+        from app.bench import run_bench
+        sys.exit(run_bench(
+            concurrency=args.concurrency, requests=args.requests, url=args.url, match=args.match,
+            baseline=args.baseline, save_baseline=args.save_baseline, tolerance=args.tolerance,
+            output=args.output
+        ))
+    elif args.command == 'startup':
+        import sys
+        from app.startup import startup_report
+        sys.exit(startup_report(path=args.path, top=args.top))
+    elif args.command == 'serve':
+        from app.serve import serve
+        serve(host=args.host, port=args.port, workers=args.workers, threads=args.threads, use_asyncio=args.asyncio)
+    else:
+        from app import create_app
+        app = create_app()
+        app.run(port=app.config['PORT'], debug=app.config['DEBUG'])
@@ -0,0 +1,16 @@
+# tests/conftest.py
+import pytest
+from app import create_app
+
+@pytest.fixture
+def app():
+    return create_app({'DEBUG': False, 'ACCESS_LOG': ''})
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def api_key_headers(client):
+    api_key = client.get('/api/auth/api-key').get_json()['api_key']
+    return {'Authorization': f'ApiKey {api_key}'}
@@ -0,0 +1,44 @@
+# tests/test_batch.py
+import base64
+import pytest
+
+AUTH_PATHS = ['/api/auth/protected', '/api/auth/jwt-only', '/api/auth/api-key-only', '/api/auth/basic-only']
+
+@pytest.fixture
+def jwt_headers(client):
+    token = client.post('/api/auth/jwt-token', json={}).get_json()['access_token']
+    return {'Authorization': f'Bearer {token}'}
+
+@pytest.fixture
+def basic_headers():
+    return {'Authorization': 'Basic ' + base64.b64encode(b'user:secret').decode('ascii')}
+
+def statuses(client, headers, items):
+    response = client.post('/api/batch', json=items, headers=headers)
+    assert response.status_code == 200
+    return [result['status'] for result in response.get_json()['responses']]
+
+def test_sub_requests_enforce_each_routes_scheme(client, api_key_headers, jwt_headers, basic_headers):
+    assert statuses(client, api_key_headers, AUTH_PATHS) == [200, 401, 200, 401]
+    assert statuses(client, jwt_headers, AUTH_PATHS) == [200, 200, 401, 401]
+    assert statuses(client, basic_headers, AUTH_PATHS) == [200, 401, 401, 200]
+
+def test_sub_request_credentials_are_ignored(client, api_key_headers, jwt_headers):
+    items = [{'path': '/api/auth/jwt-only', 'headers': jwt_headers}]
+    assert statuses(client, api_key_headers, items) == [401]
+
+def test_batch_itself_requires_auth(client):
+    assert client.post('/api/batch', json=['/api/auth/protected']).status_code == 401
+
+def test_unknown_paths_are_404(client, api_key_headers):
+    response = client.post('/api/batch', json={'requests': [
+        {'id': 'missing', 'path': '/api/does-not-exist'},
+        {'id': 'method', 'method': 'DELETE', 'path': '/api/auth/protected'},
+        {'id': 'ok', 'path': '/api/auth/protected'}
+    ]}, headers=api_key_headers)
+    results = {result['id']: result['status'] for result in response.get_json()['responses']}
+    assert results == {'missing': 404, 'method': 405, 'ok': 200}
+
+@pytest.mark.parametrize('body', [[], {'requests': []}, ['/api/batch'], [{'method': 'GET'}], ['relative'], 'nope'])
+def test_malformed_batches_are_400(client, api_key_headers, body):
+    assert client.post('/api/batch', json=body, headers=api_key_headers).status_code == 400
@@ -0,0 +1,46 @@
+# tests/test_cache.py
+from app.cache import CachedEntry, ResponseCache
+
+def test_etag_answers_if_none_match_with_304(client):
+    response = client.get('/api/products?seed=1')
+    etag = response.headers['ETag']
+    assert response.status_code == 200 and etag
+
+    revalidated = client.get('/api/products?seed=1', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    assert client.get('/api/products?seed=1', headers={'If-None-Match': '"stale"'}).status_code == 200
+
+def test_repeated_request_is_served_from_cache(app, client):
+    first = client.get('/api/products?seed=1')
+    second = client.get('/api/products?seed=1')
+    assert second.data == first.data
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert len(app.extensions['response_cache']._entries) == 1
+
+def test_cache_keys_separate_seeds_and_args(app, client):
+    by_seed = {seed: client.get(f'/api/products?seed={seed}') for seed in (1, 2)}
+    assert by_seed[1].data != by_seed[2].data
+    assert by_seed[1].headers['ETag'] != by_seed[2].headers['ETag']
+
+    page = client.get('/api/products?seed=1&limit=2')
+    assert len(page.get_json()) == 2
+    assert page.headers['ETag'] != by_seed[1].headers['ETag']
+    # Argument order does not matter
+    reordered = client.get('/api/products?limit=2&seed=1')
+    assert reordered.headers['ETag'] == page.headers['ETag']
+    assert len(app.extensions['response_cache']._entries) == 3
+
+def test_unseeded_requests_are_not_cached(app, client):
+    client.get('/api/products')
+    assert len(app.extensions['response_cache']._entries) == 0
+
+def test_lru_evicts_oldest_and_skips_large_entries():
+    cache = ResponseCache(max_entries=2, max_entry_bytes=8)
+    for key in 'abc':
+        cache.put(key, CachedEntry(key.encode(), 200, []))
+    assert cache.get('a') is None
+    assert cache.get('b') is not None and cache.get('c') is not None
+
+    cache.put('large', CachedEntry(b'x' * 9, 200, []))
+    assert cache.get('large') is None
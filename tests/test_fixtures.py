@@ -0,0 +1,77 @@
+# tests/test_fixtures.py
+import os
+import pytest
+from app import create_app
+from app.fixtures import INDEX_HEADER, MIN_CAPACITY, FixtureStore, request_key, write_fixtures
+
+def key(number):
+    return request_key('GET', '/api/users', [('id', str(number))])
+
+def body(fixture):
+    return bytes(fixture.body)
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'fixtures.mbx')
+
+def test_request_key_ignores_query_order():
+    assert request_key('get', '/a', [('x', '1'), ('y', '2')]) == request_key('GET', '/a', [('y', '2'), ('x', '1')])
+    assert request_key('GET', '/a', [('x', '1')]) != request_key('POST', '/a', [('x', '1')])
+    assert request_key('GET', '/a', [], ('v1',)) != request_key('GET', '/a', [], ('v2',))
+
+def test_append_then_lookup(path):
+    store = FixtureStore(path, writable=True)
+    assert store.get(key(1)) is None
+    store.append(key(1), 201, [['Content-Type', 'text/plain']], b'first')
+    store.append(key(2), 404, [], b'')
+
+    fixture = store.get(key(1))
+    assert (fixture.status, fixture.headers, body(fixture)) == (201, [['Content-Type', 'text/plain']], b'first')
+    assert store.get(key(2)).status == 404
+    assert store.get(key(3)) is None
+    assert len(store) == 2
+
+def test_later_record_replaces_earlier(path):
+    store = FixtureStore(path, writable=True)
+    store.append(key(1), 200, [], b'old')
+    store.append(key(1), 200, [], b'new')
+    assert body(store.get(key(1))) == b'new'
+    assert len(store) == 1
+    assert body(FixtureStore(path).get(key(1))) == b'new'
+
+def test_append_grows_the_index(path):
+    store = FixtureStore(path, writable=True)
+    count = MIN_CAPACITY // 2 + 10
+    for number in range(count):
+        store.append(key(number), 200, [], str(number).encode())
+    assert store._capacity > MIN_CAPACITY
+    reopened = FixtureStore(path)
+    assert len(reopened) == count
+    assert all(body(reopened.get(key(number))) == str(number).encode() for number in range(count))
+
+def test_missing_or_stale_index_is_rebuilt(path):
+    write_fixtures(path, [(key(number), 200, [], b'x' * number) for number in range(50)])
+    os.remove(path + '.idx')
+    store = FixtureStore(path)
+    assert os.path.exists(path + '.idx')
+    assert len(store) == 50
+    assert body(store.get(key(7))) == b'x' * 7
+
+    # An index written before the last records were appended
+    write_fixtures(path, [(key(50), 202, [], b'late')])
+    with open(path + '.idx', 'r+b') as f:
+        header = bytearray(f.read(INDEX_HEADER.size))
+        magic, capacity, count, covered = INDEX_HEADER.unpack(header)
+        f.seek(0)
+        f.write(INDEX_HEADER.pack(magic, capacity, count, covered - 1))
+    store = FixtureStore(path)
+    assert len(store) == 51
+    assert body(store.get(key(50))) == b'late'
+
+def test_replay_serves_recorded_response(path):
+    write_fixtures(path, [(request_key('GET', '/api/users', [('id', '1')]), 418, [['X-Recorded', 'yes']], b'teapot')])
+    app = create_app({'DEBUG': False, 'ACCESS_LOG': '', 'REPLAY_MODE': 'replay', 'REPLAY_FIXTURES': path})
+    client = app.test_client()
+    response = client.get('/api/users?id=1')
+    assert (response.status_code, response.headers['X-Recorded'], response.data) == (418, 'yes', b'teapot')
+    assert client.get('/api/users?id=2').status_code != 418
@@ -0,0 +1,80 @@
+# tests/test_jwt_cache.py
+import time
+import jwt
+import pytest
+from flask import Flask
+from app.auth import AuthManager
+
+@pytest.fixture
+def manager():
+    manager = AuthManager()
+    # Only the secret key is read from the app
+    manager.app = Flask(__name__)
+    manager.app.config['SECRET_KEY'] = 'test-secret-key-of-at-least-32-bytes'
+    return manager
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Count jwt.decode calls"""
+    calls = []
+    decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+    monkeypatch.setattr(jwt, 'decode', counting_decode)
+    return calls
+
+def sign(manager, **claims):
+    return jwt.encode(claims, manager.get_secret_key(), algorithm='HS256')
+
+def test_valid_token_is_decoded_once(manager, decodes):
+    token = manager.generate_jwt_token({'sub': 'alice'})
+    assert manager.verify_jwt_token(token)['sub'] == 'alice'
+    assert manager.verify_jwt_token(token)['sub'] == 'alice'
+    assert len(decodes) == 1
+
+def test_cached_payload_is_a_copy(manager):
+    token = manager.generate_jwt_token({'sub': 'alice'})
+    manager.verify_jwt_token(token)['sub'] = 'mallory'
+    assert manager.verify_jwt_token(token)['sub'] == 'alice'
+
+def test_cache_is_bounded(manager):
+    manager.jwt_cache_size = 2
+    for user in ('a', 'b', 'c'):
+        manager.verify_jwt_token(manager.generate_jwt_token({'sub': user}))
+    assert len(manager._jwt_cache) == 2
+
+def test_opaque_token_is_never_decoded(manager, decodes):
+    assert manager.verify_jwt_token('not-a-jwt') is None
+    assert decodes == []
+
+def test_bad_signature_is_negative_cached(manager, decodes):
+    header, payload, _ = manager.generate_jwt_token({'sub': 'alice'}).split('.')
+    forged = f'{header}.{payload}.{"A" * 43}'
+    assert manager.verify_jwt_token(forged) is None
+    assert manager.verify_jwt_token(forged) is None
+    assert len(decodes) == 1
+    assert len(manager._jwt_rejects) == 1
+
+def test_malformed_token_is_negative_cached(manager, decodes):
+    assert manager.verify_jwt_token('a.b.c') is None
+    assert manager.verify_jwt_token('a.b.c') is None
+    assert len(decodes) == 1
+
+def test_token_not_yet_valid_is_not_negative_cached(manager):
+    token = sign(manager, sub='alice', nbf=int(time.time()) + 1, exp=int(time.time()) + 60)
+    assert manager.verify_jwt_token(token) is None
+    assert len(manager._jwt_rejects) == 0
+    time.sleep(1.1)
+    assert manager.verify_jwt_token(token)['sub'] == 'alice'
+
+def test_expired_token_is_rejected(manager):
+    token = sign(manager, sub='alice', exp=int(time.time()) - 1)
+    assert manager.verify_jwt_token(token) is None
+
+def test_clear_jwt_cache_forgets_both_caches(manager):
+    manager.verify_jwt_token(manager.generate_jwt_token({'sub': 'alice'}))
+    manager.verify_jwt_token('a.b.c')
+    manager.clear_jwt_cache()
+    assert len(manager._jwt_cache) == 0 and len(manager._jwt_rejects) == 0
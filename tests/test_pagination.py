@@ -0,0 +1,38 @@
+# tests/test_pagination.py
+from urllib.parse import urlsplit
+import pytest
+from app import create_app
+
+SEED = 7
+FULL = 16387
+
+@pytest.fixture(scope='module')
+def client():
+    return create_app({'DEBUG': False, 'ACCESS_LOG': ''}).test_client()
+
+def phone_numbers(client, query):
+    response = client.get(f'/api/phone-numbers/public?seed={SEED}&{query}')
+    assert response.status_code == 200
+    return response.get_json()['phone_numbers'], response
+
+def test_page_matches_slice_of_full_list(client):
+    full, _ = phone_numbers(client, f'count={FULL}')
+    assert len(full) == FULL
+    for offset, count in ((0, 3), (2, 1), (16383, 3), (16380, 7), (16386, 1)):
+        page, _ = phone_numbers(client, f'count={count}&offset={offset}')
+        assert page == full[offset:offset + count]
+
+def test_cursor_pages_join_into_full_list():
+    client = create_app({'DEBUG': False, 'ACCESS_LOG': '', 'RESOURCE_TOTALS': {'phone_numbers': 40}}).test_client()
+    full, _ = phone_numbers(client, 'count=40')
+    joined, response = phone_numbers(client, 'limit=13')
+    while 'X-Next-Cursor' in response.headers:
+        next_url = urlsplit(response.headers['Link'].split(';')[0].strip('<>'))
+        response = client.get(f'{next_url.path}?{next_url.query}')
+        joined += response.get_json()['phone_numbers']
+    assert joined == full
+
+@pytest.mark.parametrize('query', ('limit=abc', 'offset=x', 'count=1.5', 'cursor=zz', 'seed=abc'))
+def test_malformed_parameters_are_rejected(client, query):
+    response = client.get(f'/api/phone-numbers/public?{query}')
+    assert response.status_code == 400
@@ -0,0 +1,57 @@
+# tests/test_snapshot.py
+import os
+import pytest
+from app.relational import RelationalStore, Table, index_key
+from app.snapshot import SnapshotError, load_snapshot
+
+SEED = 7
+TOTAL = 500
+
+@pytest.fixture
+def schemas(app):
+    return app.extensions['schemas']
+
+def serialized(app, table):
+    return app.json.dumps([table.row(position) for position in range(len(table))])
+
+def no_build(*args):
+    raise AssertionError('table was rebuilt instead of mapped')
+
+@pytest.mark.parametrize('name', ('orders', 'credit_lines', 'user_activities', 'users', 'products'))
+def test_mapped_snapshot_serves_identical_rows(app, schemas, tmp_path, monkeypatch, name):
+    schema = schemas[name]
+    built = RelationalStore._build(schema, SEED, TOTAL)
+    written = RelationalStore(snapshot_dir=str(tmp_path)).table(schema, SEED, TOTAL)
+    assert written.snapshot is not None
+
+    # A fresh store (another worker, or a restart) maps the file
+    monkeypatch.setattr(RelationalStore, '_build', staticmethod(no_build))
+    mapped = RelationalStore(snapshot_dir=str(tmp_path)).table(schema, SEED, TOTAL)
+    assert mapped.snapshot is not None
+    assert serialized(app, mapped) == serialized(app, built)
+
+    for field in schema.hash_indexes:
+        value = index_key(built.row(TOTAL // 3)[field])
+        assert list(mapped.select({field: value})) == list(built.select({field: value}))
+    if schema.sorted_index:
+        since = built.row(TOTAL // 3)[schema.sorted_index]
+        until = built.row(TOTAL // 2)[schema.sorted_index]
+        assert list(mapped.select({}, since, until)) == list(built.select({}, since, until))
+
+def test_snapshot_of_another_seed_is_rejected(schemas, tmp_path):
+    RelationalStore(snapshot_dir=str(tmp_path)).table(schemas['orders'], SEED, TOTAL)
+    path, = tmp_path.iterdir()
+    with pytest.raises(SnapshotError):
+        load_snapshot(str(path), Table, {'resource': 'orders', 'seed': SEED + 1})
+
+def test_truncated_snapshot_is_regenerated(app, schemas, tmp_path):
+    schema = schemas['orders']
+    expected = serialized(app, RelationalStore(snapshot_dir=str(tmp_path)).table(schema, SEED, TOTAL))
+    path, = tmp_path.iterdir()
+    size = os.path.getsize(path)
+    with open(path, 'r+b') as f:
+        f.truncate(size // 2)
+
+    table = RelationalStore(snapshot_dir=str(tmp_path)).table(schema, SEED, TOTAL)
+    assert serialized(app, table) == expected
+    assert os.path.getsize(path) == size
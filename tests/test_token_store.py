@@ -0,0 +1,60 @@
+# tests/test_token_store.py
+import time
+from app.token_store import TokenStore
+
+def expire(store, token):
+    """Backdate a token's expiry instead of sleeping"""
+    shard = store._shard(token)
+    expired_at = shard.tokens[token] = time.time() - 1
+    shard.expiries = [(expired_at, token)]
+
+def test_tokens_without_ttl_never_expire():
+    store = TokenStore()
+    store.add('forever')
+    assert 'forever' in store
+    store.sweep()
+    assert 'forever' in store and len(store) == 1
+
+def test_expired_token_is_rejected_and_swept():
+    store = TokenStore(shards=1)
+    store.add('short', ttl=60)
+    store.add('long', ttl=3600)
+    assert 'short' in store
+    expire(store, 'short')
+    assert 'short' not in store
+    assert sorted(store) == ['long']
+
+    store.sweep()
+    assert 'short' not in store._shards[0].tokens
+
+def test_adding_sweeps_expired_tokens_of_the_shard():
+    store = TokenStore(shards=1)
+    store.add('old', ttl=60)
+    expire(store, 'old')
+    store.add('new', ttl=60)
+    assert list(store._shards[0].tokens) == ['new']
+
+def test_ttl_expiry_in_real_time():
+    store = TokenStore()
+    store.add('brief', ttl=0.05)
+    time.sleep(0.1)
+    assert 'brief' not in store
+
+def test_each_shard_is_capped_by_evicting_its_oldest_tokens():
+    store = TokenStore(max_tokens=8, shards=2)
+    for n in range(100):
+        store.add(f'token-{n}')
+    for shard in store._shards:
+        assert len(shard.tokens) <= 4
+    assert len(store) <= 8
+    assert 'token-99' in store
+    assert 'token-0' not in store
+
+def test_discard_and_clear():
+    store = TokenStore()
+    store.add('a')
+    store.add('b', ttl=60)
+    store.discard('a')
+    assert 'a' not in store and 'b' in store
+    store.clear()
+    assert len(store) == 0 and list(store) == []